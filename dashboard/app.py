@@ -0,0 +1,172 @@
+import sys
+import os
+import time
+from typing import List, Optional
+
+import duckdb
+import polars as pl
+import streamlit as st
+from dagster import AssetKey, AssetRecordsFilter, DagsterInstance
+
+# Ensure src is in the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.resources import DuckDBQueryEngine
+from src.utils.result_cache import ResultCache
+from src.utils.smart_client import get_settings
+
+# Run with: streamlit run dashboard/app.py
+# Results are cached per query and parameters. An entry stays valid until
+# the asset it reads is materialized again (checked every VERSION_POLL_SECONDS)
+# or KNMI_DASHBOARD_CACHE_TTL_SECONDS passes, whichever comes first.
+VERSION_POLL_SECONDS = 30
+
+@st.cache_resource
+def get_engine() -> DuckDBQueryEngine:
+    return DuckDBQueryEngine()
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    settings = get_settings()
+    return ResultCache(ttl_seconds=settings.KNMI_DASHBOARD_CACHE_TTL_SECONDS, max_entries=settings.KNMI_DASHBOARD_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_version_cache() -> ResultCache:
+    return ResultCache(ttl_seconds=VERSION_POLL_SECONDS)
+
+@st.cache_resource
+def get_instance() -> Optional[DagsterInstance]:
+    # Without DAGSTER_HOME results only expire by TTL
+    return DagsterInstance.get() if os.getenv("DAGSTER_HOME") else None
+
+def data_version(asset_name: str) -> Optional[int]:
+    """
+    Storage id of the asset's latest materialization (any partition).
+    """
+    instance = get_instance()
+    if instance is None:
+        return None
+
+    def _latest() -> Optional[int]:
+        records = instance.fetch_materializations(
+            AssetRecordsFilter(asset_key=AssetKey(asset_name)), limit=1, ascending=False
+        ).records
+        return records[0].storage_id if records else None
+    return get_version_cache().get_or_compute(asset_name, _latest)
+
+def cached_query(name: str, sql: str, params: List, assets: List[str]) -> pl.DataFrame:
+    """
+    Run `sql` through DuckDB, or serve the cached frame. Arrow results are
+    wrapped by Polars without copying.
+    """
+    version = tuple(data_version(asset) for asset in assets)
+    return get_result_cache().get_or_compute(
+        (name, tuple(params)),
+        lambda: pl.from_arrow(get_engine().query(sql, params)),
+        version,
+    )
+
+def main():
+    st.set_page_config(page_title="KNMI Lakehouse", layout="wide")
+    st.title("KNMI Hourly Observations")
+    started = time.perf_counter()
+    cache = get_result_cache()
+    hits_before = cache.hits
+
+    try:
+        stations = cached_query(
+            "stations", "SELECT station, name FROM stations ORDER BY name", [], ["station_index"]
+        )
+    except duckdb.CatalogException:
+        # The view only exists once station_index has written stations.parquet
+        stations = pl.DataFrame()
+    if stations.is_empty():
+        st.warning("No stations yet: materialize `station_index` and the gold assets first.")
+        return
+    names = dict(zip(stations["station"].to_list(), stations["name"].to_list()))
+    station = st.sidebar.selectbox("Station", list(names), format_func=lambda s: f"{names[s]} ({s})")
+
+    try:
+        parameters = cached_query(
+            "parameters",
+            "SELECT DISTINCT parameter FROM gold_monthly WHERE station = ? ORDER BY parameter",
+            [station], ["gold_monthly"],
+        )["parameter"].to_list()
+    except duckdb.CatalogException:
+        # Likewise until the first gold_monthly partition lands
+        parameters = []
+    if not parameters:
+        st.info("No gold data for this station yet.")
+        return
+    parameter = st.sidebar.selectbox("Parameter", parameters, index=parameters.index("T") if "T" in parameters else 0)
+
+    bounds = cached_query(
+        "years", "SELECT min(year) AS first, max(year) AS last FROM gold_monthly WHERE station = ?",
+        [station], ["gold_monthly"],
+    )
+    first, last = int(bounds["first"][0]), int(bounds["last"][0])
+    start_year, end_year = st.sidebar.slider("Years", first, last, (max(first, last - 9), last)) if first < last else (first, last)
+
+    # 1. Monthly series against the climatology normal
+    monthly = cached_query(
+        "monthly",
+        """
+        SELECT month_start, month, mean, min, max, n_obs, n_missing
+        FROM gold_monthly
+        WHERE station = ? AND parameter = ? AND year BETWEEN ? AND ?
+        ORDER BY month_start
+        """,
+        [station, parameter, start_year, end_year], ["gold_monthly"],
+    )
+    normal = cached_query(
+        "climatology",
+        "SELECT calendar_month, mean AS normal, std FROM gold_climatology WHERE station = ? AND parameter = ?",
+        [station, parameter], ["gold_climatology"],
+    )
+    st.subheader(f"{parameter} at {names[station]}, {start_year}–{end_year}")
+    if not normal.is_empty():
+        monthly = monthly.join(normal, left_on="month", right_on="calendar_month", how="left").with_columns(
+            (pl.col("mean") - pl.col("normal")).alias("anomaly")
+        )
+    st.line_chart(monthly, x="month_start", y=[c for c in ("mean", "min", "max", "normal") if c in monthly.columns])
+    if "anomaly" in monthly.columns:
+        st.caption("Monthly anomaly against the climatology normal")
+        st.bar_chart(monthly, x="month_start", y="anomaly")
+
+    # 2. Daily detail for one year
+    year = st.sidebar.selectbox("Daily detail for", list(range(end_year, start_year - 1, -1)))
+    daily = cached_query(
+        "daily",
+        """
+        SELECT date, mean, min, max, sum
+        FROM gold_daily
+        WHERE station = ? AND parameter = ? AND year = ?
+        ORDER BY date
+        """,
+        [station, parameter, year], ["gold_daily"],
+    )
+    st.subheader(f"Daily {parameter}, {year}")
+    st.line_chart(daily, x="date", y=["mean", "min", "max"])
+
+    # 3. Data completeness
+    gaps = cached_query(
+        "gaps",
+        """
+        SELECT make_date(year, month, 1) AS month_start,
+               count(*) FILTER (WHERE is_gap) AS gap_hours,
+               count(*) AS hours
+        FROM silver_hourly
+        WHERE station = ? AND year BETWEEN ? AND ?
+        GROUP BY ALL
+        ORDER BY month_start
+        """,
+        [station, start_year, end_year], ["silver_observations"],
+    )
+    st.subheader("Hours without any observation")
+    st.bar_chart(gaps, x="month_start", y="gap_hours")
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.caption(f"Rendered in {elapsed_ms:.0f} ms · {cache.hits - hits_before} cached queries this run · {cache.misses} misses since start")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import yaml
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Where the merged instance config goes; dagster.yaml itself is never modified
+RENDERED_HOME = os.path.join(APP_DIR, "dagster_home", "instance")
+
+def render_instance(base_path: str, overlay_path: str) -> dict:
+    """
+    The instance config at `base_path` with its `storage:` block taken
+    from the overlay file.
+    """
+    with open(base_path) as f:
+        config = yaml.safe_load(f)
+    with open(overlay_path) as f:
+        config["storage"] = yaml.safe_load(f)["storage"]
+    return config
+
+def main(argv: list) -> None:
+    """
+    Container entrypoint: run `argv` on dagster.yaml, or, with
+    DAGSTER_STORAGE_OVERLAY set (e.g. deploy/postgres/storage.yaml), on
+    dagster.yaml with the overlay's storage block.
+    """
+    overlay = os.environ.get("DAGSTER_STORAGE_OVERLAY")
+    if overlay:
+        base = os.path.join(os.environ.get("DAGSTER_HOME") or APP_DIR, "dagster.yaml")
+        config = render_instance(base, os.path.join(APP_DIR, overlay))
+        os.makedirs(RENDERED_HOME, exist_ok=True)
+        # The webserver and daemon containers render into the same volume
+        tmp = os.path.join(RENDERED_HOME, f"dagster.yaml.{os.getpid()}")
+        with open(tmp, "w") as f:
+            yaml.safe_dump(config, f, sort_keys=False)
+        os.replace(tmp, os.path.join(RENDERED_HOME, "dagster.yaml"))
+        os.environ["DAGSTER_HOME"] = RENDERED_HOME
+        print(f"Instance storage: {next(iter(config['storage']))} (from {overlay})", file=sys.stderr)
+    os.execvp(argv[0], argv)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+import json
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List
+from dagster import (
+    asset,
+    AssetDep,
+    AssetExecutionContext,
+    AssetKey,
+    AssetRecordsFilter,
+    DagsterEventType,
+    MaterializeResult,
+    MultiPartitionKey,
+    MultiToSingleDimensionPartitionMapping,
+)
+from src.assets.ingestion import monthly_partitions
+from src.utils.storage import open_landing
+from src.partitions import knmi_stations_def
+from src.resources import KnmiClientResource
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Configure Logging
+logger = logging.getLogger(__name__)
+
+# Bronze is one compacted Parquet file per month plus a manifest recording
+# which landing materialization of every station it was built from.
+# Structure: bronze/source=knmi/type=hourly/year={yyyy}/month={mm}/data.parquet
+LANDING_ASSET = AssetKey("knmi_hourly_observations")
+BRONZE_ROW_GROUP_SIZE = 256 * 1024
+
+def bronze_path(data_root: str, month: datetime, filename: str = "data.parquet") -> str:
+    """
+    Hive-style bronze path for one month (all stations).
+    """
+    return f"{data_root}/bronze/source=knmi/type=hourly/year={month.year}/month={month.month:02d}/{filename}"
+
+def load_manifest(fs, path: str) -> Dict[str, dict]:
+    """
+    Return {station: {"storage_id", "source", "rows"}} for a bronze month,
+    or {} if the month has not been compacted yet.
+    """
+    if not fs.exists(path):
+        return {}
+    with fs.open(path, "r") as f:
+        return json.load(f)["stations"]
+
+def read_landing_table(fs, path: str, station_id: str) -> "pa.Table":
+    """
+    Decode one landing file (Parquet or, possibly compressed, CoverageJSON).
+    """
+    import pyarrow.parquet as pq
+    from src.utils.coverage import stream_coverage_table
+
+    if path.endswith(".parquet"):
+        with fs.open(path, "rb") as f:
+            return pq.read_table(f)
+    with open_landing(fs, path) as f:
+        return stream_coverage_table(f, station_id)
+
+def _compact(tables: List["pa.Table"]) -> "pa.Table":
+    """
+    Merge station tables into one month table. Stations report different
+    parameter sets, so missing columns become nulls (ints widen to float).
+    """
+    import pyarrow as pa
+
+    table = pa.concat_tables(tables, promote_options="permissive")
+    params = sorted(name for name in table.column_names if name not in ("timestamp", "station"))
+    table = table.select(["timestamp", "station", *params])
+    return table.sort_by([("station", "ascending"), ("timestamp", "ascending")])
+
+def _latest_landings(context: AssetExecutionContext, partition_keys: List[str]) -> Dict[str, dict]:
+    """
+    Latest landing materialization per upstream partition:
+    {partition key: {"storage_id", "path", "sha256"}}.
+    """
+    asset_key = LANDING_ASSET
+    storage_ids = context.instance.get_latest_storage_id_by_partition(
+        asset_key, DagsterEventType.ASSET_MATERIALIZATION, set(partition_keys)
+    )
+    if not storage_ids:
+        return {}
+    records = context.instance.fetch_materializations(
+        AssetRecordsFilter(asset_key=asset_key, storage_ids=list(storage_ids.values())),
+        limit=len(storage_ids),
+    ).records
+
+    latest = {}
+    for record in records:
+        materialization = record.asset_materialization
+        path = materialization.metadata.get("path")
+        digest = materialization.metadata.get("sha256")
+        if path is not None:
+            latest[materialization.partition] = {
+                "storage_id": record.storage_id,
+                "path": path.value,
+                "sha256": digest.value if digest is not None else None,
+            }
+    return latest
+
+@asset(
+    partitions_def=monthly_partitions,
+    deps=[AssetDep(
+        LANDING_ASSET,
+        partition_mapping=MultiToSingleDimensionPartitionMapping(partition_dimension_name="date"),
+    )],
+    group_name="bronze",
+    compute_kind="pyarrow",
+)
+def bronze_observations(context: AssetExecutionContext, knmi: KnmiClientResource) -> MaterializeResult:
+    """
+    Compacts a month of landing files (one per station) into a single
+    columnar Parquet file.
+
+    Incremental: the manifest stores the landing materialization (and content
+    hash) each station was built from, so only station-months whose landing
+    data changed since the last run are decoded; the rows of every other
+    station are carried over from the existing bronze file.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from src.utils.coverage import TIMESTAMP_TYPE
+
+    client = knmi.get_client()
+    fs = client.get_filesystem()
+    month = context.partition_time_window.start
+    data_path = bronze_path(client.settings.DATA_ROOT, month)
+    manifest_path = bronze_path(client.settings.DATA_ROOT, month, "_manifest.json")
+
+    # 1. Which stations have a newer landing file than the one in bronze?
+    manifest = load_manifest(fs, manifest_path)
+    stations = knmi_stations_def.get_partition_keys(dynamic_partitions_store=context.instance)
+    partition_keys = {
+        str(MultiPartitionKey({"station": station_id, "date": context.partition_key})): station_id
+        for station_id in stations
+    }
+    latest = _latest_landings(context, list(partition_keys))
+    pending = {}
+    for partition_key, landing in latest.items():
+        station_id = partition_keys[partition_key]
+        built_from = manifest.get(station_id, {})
+        # Compare content hashes where landing recorded one: a rerun that
+        # found the data unchanged does not trigger a rebuild
+        if landing["sha256"] is not None:
+            changed = built_from.get("sha256") != landing["sha256"]
+        else:
+            changed = built_from.get("storage_id") != landing["storage_id"]
+        if changed:
+            pending[station_id] = landing
+
+    if not pending and fs.exists(data_path):
+        logger.info(f"Bronze {month:%Y-%m} is up to date ({len(manifest)} stations)")
+        return MaterializeResult(metadata={
+            "path": data_path,
+            "stations": len(manifest),
+            "rows": sum(entry["rows"] for entry in manifest.values()),
+            "processed_stations": 0,
+        })
+
+    # 2. Carry over unchanged stations, decode only the new landing files
+    tables: List["pa.Table"] = []
+    if fs.exists(data_path):
+        with fs.open(data_path, "rb") as f:
+            existing = pq.read_table(f)
+        keep = pc.invert(pc.is_in(existing["station"], value_set=pa.array(list(pending), pa.string())))
+        tables.append(existing.filter(keep))
+
+    for station_id, landing in sorted(pending.items()):
+        table = read_landing_table(fs, landing["path"], station_id)
+        manifest[station_id] = {
+            "storage_id": landing["storage_id"],
+            "sha256": landing["sha256"],
+            "source": landing["path"],
+            "rows": table.num_rows,
+        }
+        if table.num_rows:
+            tables.append(table)
+
+    if tables:
+        table = _compact(tables)
+    else:
+        table = pa.table({"timestamp": pa.array([], TIMESTAMP_TYPE), "station": pa.array([], pa.string())})
+
+    # 3. Write data first, manifest last: the manifest is the commit point
+    with fs.open(data_path, "wb") as f:
+        pq.write_table(table, f, compression="zstd", row_group_size=BRONZE_ROW_GROUP_SIZE, write_statistics=True)
+        size = f.tell()
+    with fs.open(manifest_path, "w") as f:
+        json.dump({"year": month.year, "month": month.month, "stations": manifest}, f, indent=2, sort_keys=True)
+
+    logger.info(f"Bronze {month:%Y-%m}: {len(pending)} station(s) refreshed, {table.num_rows} rows")
+    return MaterializeResult(metadata={
+        "path": data_path,
+        "stations": len(manifest),
+        "rows": table.num_rows,
+        "processed_stations": len(pending),
+        "size_mb": size / 1024 / 1024,
+    })
@@ -0,0 +1,246 @@
+import re
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List, Optional
+from dagster import (
+    asset,
+    AssetExecutionContext,
+    AssetKey,
+    AutomationCondition,
+    Config,
+    Failure,
+    MaterializeResult,
+)
+from pydantic import Field
+from src.assets.ingestion import monthly_partitions
+from src.assets.silver import is_current, silver_path, source_digest, write_with_manifest
+from src.resources import DuckDBQueryEngine, KnmiClientResource, HIVE_TYPES
+from src.utils.landing_manifest import json_digest
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Configure Logging
+logger = logging.getLogger(__name__)
+
+# Gold rollups are long tables (station, period, parameter) of a few thousand
+# rows per month, built from silver with DuckDB.
+# Structure: gold/source=knmi/type={daily|monthly}/year={yyyy}/month={mm}/data.parquet
+#            gold/source=knmi/type=climatology/data.parquet
+SILVER_ASSET = AssetKey("silver_observations")
+NUMERIC_TYPES = ("DOUBLE", "FLOAT", "REAL", "BIGINT", "INTEGER", "SMALLINT", "TINYINT", "HUGEINT")
+
+def gold_path(data_root: str, rollup: str, month: Optional[datetime] = None, filename: str = "data.parquet") -> str:
+    if month is None:
+        return f"{data_root}/gold/source=knmi/type={rollup}/{filename}"
+    return f"{data_root}/gold/source=knmi/type={rollup}/year={month.year}/month={month.month:02d}/{filename}"
+
+def _numeric_columns(duckdb: DuckDBQueryEngine, path: str) -> List[str]:
+    """
+    Parameter columns of a silver file that can be aggregated.
+    """
+    described = duckdb.query(f"DESCRIBE SELECT * FROM read_parquet('{path}', hive_partitioning = false)").to_pylist()
+    return [
+        row["column_name"] for row in described
+        if row["column_name"] not in ("timestamp", "station") and row["column_type"] in NUMERIC_TYPES
+    ]
+
+def daily_rollup(duckdb: DuckDBQueryEngine, silver_file: str) -> "pa.Table":
+    """
+    Per station, UTC calendar day and parameter: observed and missing
+    hours (gap hours count as missing), min, max, mean, sum. Non-numeric
+    parameters are skipped.
+    """
+    import pyarrow as pa
+
+    params = _numeric_columns(duckdb, silver_file)
+    schema = pa.schema([
+        ("station", pa.string()), ("date", pa.date32()), ("parameter", pa.string()),
+        ("n_obs", pa.int64()), ("n_missing", pa.int64()),
+        ("min", pa.float64()), ("max", pa.float64()), ("mean", pa.float64()), ("sum", pa.float64()),
+    ])
+    if not params:
+        return schema.empty_table()
+    casts = ", ".join(f'CAST("{p}" AS DOUBLE) AS "{p}"' for p in params)
+    columns = ", ".join(f'"{p}"' for p in params)
+    table = duckdb.query(f"""
+        WITH hourly AS (
+            SELECT station, CAST(timezone('UTC', "timestamp") AS DATE) AS date, {casts}
+            FROM read_parquet('{silver_file}', hive_partitioning = false)
+        )
+        SELECT
+            station, date, parameter,
+            count(value) AS n_obs,
+            count(*) - count(value) AS n_missing,
+            min(value) AS min, max(value) AS max, avg(value) AS mean, sum(value) AS sum
+        FROM hourly UNPIVOT INCLUDE NULLS (value FOR parameter IN ({columns}))
+        GROUP BY station, date, parameter
+        ORDER BY station, parameter, date
+    """)
+    return table.cast(schema)
+
+def monthly_rollup(duckdb: DuckDBQueryEngine, daily_file: str) -> "pa.Table":
+    """
+    Roll the daily table up to one row per station, month and parameter.
+    The mean is weighted by observations, not an average of daily means.
+    """
+    return duckdb.query(f"""
+        SELECT
+            station,
+            CAST(date_trunc('month', date) AS DATE) AS month_start,
+            parameter,
+            CAST(sum(n_obs) AS BIGINT) AS n_obs,
+            CAST(sum(n_missing) AS BIGINT) AS n_missing,
+            count(*) FILTER (WHERE n_obs > 0) AS days,
+            min(min) AS min,
+            max(max) AS max,
+            sum(sum) / nullif(sum(n_obs), 0) AS mean,
+            sum(sum) AS sum
+        FROM read_parquet('{daily_file}', hive_partitioning = false)
+        GROUP BY ALL
+        ORDER BY station, parameter
+    """)
+
+@asset(
+    partitions_def=monthly_partitions,
+    deps=[SILVER_ASSET],
+    group_name="gold",
+    compute_kind="duckdb",
+    automation_condition=AutomationCondition.eager(),
+)
+def gold_daily(context: AssetExecutionContext, duckdb: DuckDBQueryEngine, knmi: KnmiClientResource) -> MaterializeResult:
+    """
+    Daily aggregates (min/max/mean/sum, observed and missing hours) per
+    station and parameter for one month.
+
+    Skipped when the silver manifest is unchanged since the last build, so
+    only months whose stations were re-ingested are recomputed.
+    """
+    client = knmi.get_client()
+    fs = client.get_filesystem()
+    month = context.partition_time_window.start
+    data_root = client.settings.DATA_ROOT
+    data_path = gold_path(data_root, "daily", month)
+    manifest_path = gold_path(data_root, "daily", month, "_manifest.json")
+
+    digest = source_digest(fs, silver_path(data_root, month, "_manifest.json"))
+    if digest is None:
+        raise Failure(f"Silver {month:%Y-%m} has not been materialized")
+    if is_current(fs, manifest_path, data_path, digest):
+        logger.info(f"Gold daily {month:%Y-%m} is up to date")
+        return MaterializeResult(metadata={"path": data_path, "recomputed": False})
+
+    table = daily_rollup(duckdb, silver_path(data_root, month))
+    size = write_with_manifest(fs, data_path, manifest_path, table, digest)
+    logger.info(f"Gold daily {month:%Y-%m}: {table.num_rows} rows")
+    return MaterializeResult(metadata={
+        "path": data_path,
+        "recomputed": True,
+        "rows": table.num_rows,
+        "size_mb": size / 1024 / 1024,
+    })
+
+@asset(
+    partitions_def=monthly_partitions,
+    deps=[gold_daily],
+    group_name="gold",
+    compute_kind="duckdb",
+    automation_condition=AutomationCondition.eager(),
+)
+def gold_monthly(context: AssetExecutionContext, duckdb: DuckDBQueryEngine, knmi: KnmiClientResource) -> MaterializeResult:
+    """
+    Monthly aggregates per station and parameter, rolled up from gold_daily.
+    """
+    client = knmi.get_client()
+    fs = client.get_filesystem()
+    month = context.partition_time_window.start
+    data_root = client.settings.DATA_ROOT
+    data_path = gold_path(data_root, "monthly", month)
+    manifest_path = gold_path(data_root, "monthly", month, "_manifest.json")
+
+    digest = source_digest(fs, gold_path(data_root, "daily", month, "_manifest.json"))
+    if digest is None:
+        raise Failure(f"Gold daily {month:%Y-%m} has not been materialized")
+    if is_current(fs, manifest_path, data_path, digest):
+        logger.info(f"Gold monthly {month:%Y-%m} is up to date")
+        return MaterializeResult(metadata={"path": data_path, "recomputed": False})
+
+    table = monthly_rollup(duckdb, gold_path(data_root, "daily", month))
+    size = write_with_manifest(fs, data_path, manifest_path, table, digest)
+    return MaterializeResult(metadata={
+        "path": data_path,
+        "recomputed": True,
+        "rows": table.num_rows,
+        "size_mb": size / 1024 / 1024,
+    })
+
+class ClimatologyConfig(Config):
+    start_year: Optional[int] = Field(None, description="First year of the normal period (default: earliest available)")
+    end_year: Optional[int] = Field(None, description="Last year of the normal period (default: last complete year)")
+    min_coverage: float = Field(0.8, description="Minimum fraction of observed hours for a month to count")
+
+@asset(
+    deps=[gold_monthly],
+    group_name="gold",
+    compute_kind="duckdb",
+    automation_condition=AutomationCondition.eager(),
+)
+def gold_climatology(context: AssetExecutionContext, config: ClimatologyConfig, duckdb: DuckDBQueryEngine, knmi: KnmiClientResource) -> MaterializeResult:
+    """
+    Multi-year normals per station, parameter and calendar month: the mean
+    (and spread) of the monthly values over the normal period. Months with
+    less than `min_coverage` of their hours observed are left out.
+    """
+    client = knmi.get_client()
+    fs = client.get_filesystem()
+    data_root = client.settings.DATA_ROOT
+    start_year = config.start_year or 0
+    end_year = config.end_year or datetime.now(timezone.utc).year - 1
+
+    # Skip when none of the monthly manifests in the period changed; the
+    # running month is outside the default period, so NRT runs don't count
+    manifests = [
+        path for path in sorted(fs.glob(gold_path(data_root, "monthly", None, "year=*/month=*/_manifest.json")))
+        if start_year <= int(re.search(r"/year=(\d{4})/", path).group(1)) <= end_year
+    ]
+    sources = fs.cat(manifests) if manifests else {}
+    digest = json_digest({
+        "config": config.model_dump(),
+        "end_year": end_year,
+        "sources": {path: body.decode("utf-8") for path, body in sorted(sources.items())},
+    })
+    data_path = gold_path(data_root, "climatology")
+    manifest_path = gold_path(data_root, "climatology", None, "_manifest.json")
+    if is_current(fs, manifest_path, data_path, digest):
+        logger.info("Gold climatology is up to date")
+        return MaterializeResult(metadata={"path": data_path, "recomputed": False})
+
+    monthly = f"read_parquet('{gold_path(data_root, 'monthly', None, 'year=*/month=*/data.parquet')}', hive_partitioning = true, hive_types = {HIVE_TYPES})"
+    table = duckdb.query(f"""
+        SELECT
+            station,
+            month AS calendar_month,
+            parameter,
+            count(*) AS n_years,
+            min(year) AS first_year,
+            max(year) AS last_year,
+            avg(mean) AS mean,
+            stddev_samp(mean) AS std,
+            avg(min) AS mean_min,
+            avg(max) AS mean_max,
+            avg(sum) AS mean_sum
+        FROM {monthly}
+        WHERE year BETWEEN ? AND ?
+          AND n_obs > 0
+          AND n_obs >= ? * (n_obs + n_missing)
+        GROUP BY ALL
+        ORDER BY station, parameter, calendar_month
+    """, [start_year, end_year, config.min_coverage])
+    size = write_with_manifest(fs, data_path, manifest_path, table, digest)
+    return MaterializeResult(metadata={
+        "path": data_path,
+        "recomputed": True,
+        "rows": table.num_rows,
+        "months_in_scope": len(manifests),
+        "size_mb": size / 1024 / 1024,
+    })
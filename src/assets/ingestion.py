@@ -1,14 +1,32 @@
 import json
+import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from pydantic import Field
 from dagster import (
     asset,
-    Output,
+    AssetExecutionContext,
+    AssetMaterialization,
+    BackfillPolicy,
+    Config,
+    Failure,
     MultiPartitionsDefinition,
     MonthlyPartitionsDefinition,
-    AssetExecutionContext
 )
-from src.utils.smart_client import KnmiClient
+from src.utils.metrics import Metrics, export_metrics
+from src.utils.landing_manifest import LandingManifest, PartitionRef, is_settled, json_digest, table_digest, utc_now
+from src.utils.smart_client import NOT_MODIFIED, KnmiClient, Window
+from src.utils.storage import Compression, LandingWriter, compressed_name, dump_json, open_landing
+from src.utils.window_planner import add_months, parse_time
 from src.partitions import knmi_stations_def
+from src.resources import KnmiClientResource
+
+# Arrow is imported inside the functions that touch data, so loading the code
+# location (webserver, daemon, every sensor tick) does not pay for it
+if TYPE_CHECKING:
+    import pyarrow as pa
 
 # Configure Logging
 logger = logging.getLogger(__name__)
@@ -16,87 +34,613 @@ logger = logging.getLogger(__name__)
 # Define Partitions
 # We combine the Dynamic Stations with Monthly Time windows.
 # Start date: 2014-01-01 (Matching our 10-year goal)
-monthly_partitions = MonthlyPartitionsDefinition(start_date="2014-01-01")
+# end_offset=1 includes the running month, which the near-real-time schedule refreshes hourly
+monthly_partitions = MonthlyPartitionsDefinition(start_date="2014-01-01", end_offset=1)
 
 knmi_partitions = MultiPartitionsDefinition({
     "station": knmi_stations_def,
     "date": monthly_partitions
 })
 
+# Backfills are chunked into runs of at most this many station-months.
+# One run per partition spends more time on process startup and event-log
+# writes than on the HTTP call itself.
+MAX_PARTITIONS_PER_RUN = 120
+
+# Format for API: ISO8601
+# KNMI EDR usually accepts exact ISO strings
+API_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Run tag that makes the asset ignore the landing manifest and refetch everything
+FORCE_REFETCH_TAG = "knmi/force_refetch"
+
+# Concurrency pool of every step that calls the KNMI API, and the run tag that
+# dagster.yaml limits concurrent API-bound runs by. The token bucket enforces
+# the quota itself; these keep the number of processes contending for it (and
+# for the SQLite event log) small.
+KNMI_API_POOL = "knmi_api"
+KNMI_API_RUN_TAG = "knmi/api"
+
+class IngestionConfig(Config):
+    incremental: bool = Field(
+        False,
+        description="Only fetch hours after each current-month partition's high-water mark and append them",
+    )
+
+def partition_window(partition_key: str) -> Tuple[str, datetime, datetime]:
+    """
+    Resolve a 'date|station' partition key into (station_id, start, end).
+    The end is exclusive (start of next month), as provided by Dagster.
+    """
+    # MultiPartition key format: MultiPartitionKey(keys_by_dimension={'station': '...', 'date': '...'})
+    keys = knmi_partitions.get_partition_key_from_str(partition_key).keys_by_dimension
+    time_window = monthly_partitions.time_window_for_partition_key(keys["date"])
+    return keys["station"], time_window.start, time_window.end
+
+def landing_path(data_root: str, station_id: str, start_dt: datetime, filename: str = "data.json") -> str:
+    """
+    Hive-style landing path for one station-month.
+    Structure: source=knmi/type=hourly/station={id}/year={yyyy}/month={mm}/{filename}
+    """
+    return (
+        f"{data_root}/landing/source=knmi/type=hourly/station={station_id}"
+        f"/year={start_dt.year}/month={start_dt.month:02d}/{filename}"
+    )
+
+def _write_json(fs, path: str, data: dict, compression: Compression) -> int:
+    """
+    Stream-encode one landing document through the codec into storage.
+    Returns the stored (compressed) size in bytes, no HEAD needed.
+    """
+    with LandingWriter(fs, path, compression) as writer:
+        dump_json(data, writer)
+    return writer.bytes_written
+
+def _write_parquet(fs, path: str, table: "pa.Table") -> int:
+    """
+    Upload one station-month as zstd Parquet with column statistics, so
+    DuckDB can prune row groups on timestamp. Returns its size in bytes.
+    """
+    import pyarrow.parquet as pq
+
+    with fs.open(path, "wb") as f:
+        pq.write_table(table, f, compression="zstd", write_statistics=True)
+        return f.tell()
+
+def landing_target(settings, station_id: str, month: datetime) -> str:
+    """
+    Path the current landing settings write a station-month to.
+    """
+    if settings.KNMI_LANDING_FORMAT == "parquet":
+        return landing_path(settings.DATA_ROOT, station_id, month, "data.parquet")
+    return landing_path(settings.DATA_ROOT, station_id, month, compressed_name("data.json", settings.KNMI_LANDING_COMPRESSION))
+
+def _partition_metadata(settings, station_id: str, month: datetime) -> dict:
+    return {
+        "station": station_id,
+        "year": month.year,
+        "month": month.month,
+        "format": settings.KNMI_LANDING_FORMAT,
+    }
+
+def _entry_metadata(entry: dict, status: str) -> dict:
+    """
+    Metadata for a partition whose landing file was left as is.
+    """
+    return {
+        "path": entry["path"],
+        "size_mb": entry["size"] / 1024 / 1024,
+        "rows": entry["rows"],
+        "sha256": entry["sha256"],
+        "status": status,
+    }
+
+def _metrics_metadata(client: KnmiClient, window: Window, partitions: int, metrics: Metrics) -> dict:
+    """
+    Instrumentation for one partition: the fetch phases of the API call it
+    came from (shared by its `window_partitions` partitions) plus its own
+    upload and manifest time. The partition's share is added to the run total.
+    """
+    client.metrics.merge(metrics)
+    return {
+        **client.window_metrics.get(window, Metrics()).as_metadata(),
+        **metrics.as_metadata(),
+        "window_partitions": partitions,
+    }
+
+def _report(context: AssetExecutionContext, landed: Dict[str, dict], partition_key: str, metadata: dict) -> None:
+    """
+    Attach a partition's metadata to its materialization and remember it,
+    in case the run fails and the landed partitions must be reported on their own.
+    """
+    context.add_asset_metadata(metadata, partition_key=partition_key)
+    landed[partition_key] = metadata
+
+def _doc_rows(doc: dict) -> int:
+    return sum(len(c["domain"]["axes"]["t"].get("values", [])) for c in doc.get("coverages", []))
+
+def high_water_mark(data) -> Optional[str]:
+    """
+    Latest timestamp in a landing document or table (ISO8601), None if empty.
+    """
+    if not isinstance(data, dict):
+        import pyarrow.compute as pc
+
+        if data.num_rows == 0:
+            return None
+        return pc.max(data["timestamp"]).as_py().strftime(API_TIME_FORMAT)
+    last = [c["domain"]["axes"]["t"]["values"][-1] for c in data.get("coverages", []) if c["domain"]["axes"]["t"].get("values")]
+    return max(last, key=parse_time) if last else None
+
+def _land_window(
+    client: KnmiClient,
+    window: Window,
+    months: Dict[datetime, str],
+    result,
+    decode: str,
+    manifest: LandingManifest,
+    entries: Dict[PartitionRef, dict],
+) -> Dict[str, dict]:
+    """
+    Slice one API response into its months and write the landing files
+    in the configured format. Months whose content hash matches the
+    manifest are not uploaded again. Returns {partition key: metadata}.
+    """
+    import pyarrow as pa
+    from src.utils.coverage import TIMESTAMP_TYPE, split_coverage_by_month, split_table_by_month
+
+    fs = client.get_filesystem()
+    settings = client.settings
+    compression = settings.KNMI_LANDING_COMPRESSION
+    station_id = window[0]
+    fetched_at = utc_now()
+    validators = client.validators.get(window, {})
+
+    tables, docs, document = {}, {}, None
+    if decode == "json":
+        document = result
+    elif decode == "table":
+        tables = split_table_by_month(result)
+    else:
+        # Parquet plus the original JSON kept beside it
+        table, document = result
+        tables = split_table_by_month(table)
+    if document is not None:
+        docs = split_coverage_by_month(document)
+
+    landed = {}
+    for month, partition_key in months.items():
+        metrics = Metrics()
+        metadata = _partition_metadata(settings, station_id, month)
+        path = landing_target(settings, station_id, month)
+        entry = entries.get((station_id, month))
+        if settings.KNMI_LANDING_FORMAT == "parquet":
+            table = tables.get(month)
+            if table is None:
+                table = pa.table({"timestamp": pa.array([], TIMESTAMP_TYPE), "station": pa.array([], pa.string())})
+            rows, digest, hwm = table.num_rows, table_digest(table), high_water_mark(table)
+        else:
+            doc = docs.get(month, {**document, "coverages": []})
+            rows, digest, hwm = _doc_rows(doc), json_digest(doc), high_water_mark(doc)
+
+        unchanged = entry is not None and entry["path"] == path and entry["sha256"] == digest
+        if unchanged:
+            size = entry["size"]
+        elif settings.KNMI_LANDING_FORMAT == "parquet":
+            with metrics.timer("upload"):
+                size = _write_parquet(fs, path, table)
+                metrics.incr("bytes_uploaded", size)
+                if document is not None:
+                    # The JSON copy is only kept for audit, so always compress it
+                    codec = "gzip" if compression == "none" else compression
+                    doc = docs.get(month, {**document, "coverages": []})
+                    json_path = landing_path(settings.DATA_ROOT, station_id, month, compressed_name("data.json", codec))
+                    metrics.incr("bytes_uploaded", _write_json(fs, json_path, doc, codec))
+        else:
+            with metrics.timer("upload"):
+                size = _write_json(fs, path, doc, compression)
+            metrics.incr("bytes_uploaded", size)
+            metadata["compression"] = compression
+
+        with metrics.timer("manifest"):
+            manifest.save(station_id, month, {
+                "partition_key": partition_key,
+                "path": path,
+                "sha256": digest,
+                "rows": rows,
+                "size": size,
+                "fetched_at": fetched_at,
+                "window": list(window),
+                "validators": validators,
+                "high_water_mark": hwm,
+            })
+        metadata.update({
+            "path": path,
+            "size_mb": size / 1024 / 1024,
+            "rows": rows,
+            "sha256": digest,
+            "status": "unchanged" if unchanged else "written",
+            **_metrics_metadata(client, window, len(months), metrics),
+        })
+        landed[partition_key] = metadata
+    return landed
+
+def _touch_window(client: KnmiClient, window: Window, months: Dict[datetime, str], manifest: LandingManifest, entries: Dict[PartitionRef, dict]) -> Dict[str, dict]:
+    """
+    The server confirmed a window is unchanged (304): only refresh the
+    manifest's fetch time so the months can become settled.
+    """
+    settings = client.settings
+    fetched_at = utc_now()
+    landed = {}
+    for month, partition_key in months.items():
+        metrics = Metrics()
+        entry = {**entries[(window[0], month)], "fetched_at": fetched_at}
+        entry["validators"] = client.validators.get(window) or entry["validators"]
+        with metrics.timer("manifest"):
+            manifest.save(window[0], month, entry)
+        landed[partition_key] = {
+            **_partition_metadata(settings, window[0], month),
+            **_entry_metadata(entry, "not_modified"),
+            **_metrics_metadata(client, window, len(months), metrics),
+        }
+    return landed
+
+def plan_revalidations(partition_keys: Iterable[str], entries: Dict[PartitionRef, dict]) -> Tuple[Dict[Window, Dict[datetime, str]], Dict[Window, Dict[str, str]], List[str]]:
+    """
+    Revalidation calls for partitions whose manifest entry has an ETag or
+    Last-Modified: the validators belong to the window the partition was
+    landed from, so that window is requested again as is, whatever span the
+    planner has moved to since. A window that does not cover the whole
+    month (e.g. one recorded by an append) could only replace the month
+    with a slice of it, so such partitions are planned afresh. Returns
+    (calls, {window: validators}, partition keys left for `plan_calls`).
+    """
+    by_window: Dict[Window, Dict[datetime, str]] = defaultdict(dict)
+    rest = []
+    for partition_key in partition_keys:
+        station_id, start_dt, end_dt = partition_window(partition_key)
+        entry = entries.get((station_id, start_dt))
+        if (
+            entry and entry.get("validators") and entry.get("window")
+            and parse_time(entry["window"][1]) <= start_dt
+            and parse_time(entry["window"][2]) >= end_dt
+        ):
+            by_window[tuple(entry["window"])][start_dt] = partition_key
+        else:
+            rest.append(partition_key)
+
+    calls, conditional = {}, {}
+    for window, months in by_window.items():
+        validators = [entries[(window[0], month)]["validators"] for month in months]
+        if all(v == validators[0] for v in validators):
+            calls[window] = months
+            conditional[window] = validators[0]
+        else:
+            # Some months were refetched since: replan them
+            rest.extend(months.values())
+    return calls, conditional, rest
+
+def _append_window(
+    client: KnmiClient,
+    window: Window,
+    month: datetime,
+    partition_key: str,
+    result,
+    decode: str,
+    manifest: LandingManifest,
+    entry: dict,
+) -> dict:
+    """
+    Merge the hours after the partition's high-water mark into its existing
+    landing file (and the kept JSON copy) and advance the mark.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from src.utils.coverage import append_coverage
+
+    fs = client.get_filesystem()
+    settings = client.settings
+    station_id = window[0]
+    metrics = Metrics()
+    after, before = parse_time(entry["high_water_mark"]), add_months(month, 1)
+    path = entry["path"]
+
+    document = new = None
+    if decode == "json":
+        document = result
+    elif decode == "table":
+        new = result
+    else:
+        new, document = result
+
+    if settings.KNMI_LANDING_FORMAT == "parquet":
+        if new.num_rows:
+            ts = new["timestamp"]
+            new = new.filter(pc.and_(pc.greater(ts, pa.scalar(after, ts.type)), pc.less(ts, pa.scalar(before, ts.type))))
+        appended = new.num_rows
+        if appended:
+            # Read-modify-write of the existing file counts as upload time
+            with metrics.timer("upload"):
+                with fs.open(path, "rb") as f:
+                    existing = pq.read_table(f)
+                merged = pa.concat_tables([existing, new], promote_options="permissive")
+                size = _write_parquet(fs, path, merged)
+                metrics.incr("bytes_uploaded", size)
+                rows, digest, hwm = merged.num_rows, table_digest(merged), high_water_mark(merged)
+                if document is not None:
+                    codec = "gzip" if settings.KNMI_LANDING_COMPRESSION == "none" else settings.KNMI_LANDING_COMPRESSION
+                    json_path = landing_path(settings.DATA_ROOT, station_id, month, compressed_name("data.json", codec))
+                    if fs.exists(json_path):
+                        with open_landing(fs, json_path) as f:
+                            kept, _ = append_coverage(json.load(f), document, after, before)
+                        metrics.incr("bytes_uploaded", _write_json(fs, json_path, kept, codec))
+    else:
+        with metrics.timer("upload"):
+            with open_landing(fs, path) as f:
+                merged, appended = append_coverage(json.load(f), document, after, before)
+            if appended:
+                size = _write_json(fs, path, merged, settings.KNMI_LANDING_COMPRESSION)
+                metrics.incr("bytes_uploaded", size)
+                rows, digest, hwm = _doc_rows(merged), json_digest(merged), high_water_mark(merged)
+
+    if appended:
+        entry = {**entry, "rows": rows, "sha256": digest, "size": size, "high_water_mark": hwm}
+    # `window`/`validators` keep describing the month's landing call (they are
+    # what the month is revalidated with); the append's own slice is kept apart
+    entry = {
+        **entry,
+        "fetched_at": utc_now(),
+        "append_window": list(window),
+        "append_validators": client.validators.get(window, {}),
+    }
+    with metrics.timer("manifest"):
+        manifest.save(station_id, month, entry)
+    return {
+        **_partition_metadata(settings, station_id, month),
+        **_entry_metadata(entry, "appended" if appended else "up_to_date"),
+        "rows_appended": appended,
+        "high_water_mark": entry["high_water_mark"],
+        **_metrics_metadata(client, window, 1, metrics),
+    }
+
+def plan_appends(partitions: Dict[str, PartitionRef], entries: Dict[PartitionRef, dict], now: datetime) -> Tuple[Dict[Window, Tuple[datetime, str]], List[str]]:
+    """
+    One call per partition covering only the hours after its high-water
+    mark. Returns ({window: (month, partition key)}, partitions already current).
+    """
+    calls, current = {}, []
+    next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    for partition_key, (station_id, month) in partitions.items():
+        start = parse_time(entries[(station_id, month)]["high_water_mark"]) + timedelta(hours=1)
+        end = min(add_months(month, 1), next_hour)
+        if start >= end:
+            current.append(partition_key)
+            continue
+        calls[(station_id, start.strftime(API_TIME_FORMAT), end.strftime(API_TIME_FORMAT))] = (month, partition_key)
+    return calls, current
+
+async def _append(
+    context: AssetExecutionContext,
+    client: KnmiClient,
+    calls: Dict[Window, Tuple[datetime, str]],
+    manifest: LandingManifest,
+    entries: Dict[PartitionRef, dict],
+    landed: Dict[str, dict],
+) -> List[str]:
+    """
+    Incremental twin of `_ingest`: fetch the recent hours of every partition
+    concurrently and append them. Returns the partition keys that failed.
+    """
+    settings = client.settings
+    if settings.KNMI_LANDING_FORMAT == "json":
+        decode = "json"
+    else:
+        decode = "table_json" if settings.KNMI_LANDING_KEEP_JSON else "table"
+
+    failed = []
+    async for window, result in client.fetch_many(calls, return_exceptions=True, decode=decode):
+        month, partition_key = calls[window]
+        if isinstance(result, Exception):
+            context.log.error(f"Incremental fetch failed for {partition_key}: {result}")
+            failed.append(partition_key)
+            continue
+        entry = entries[(window[0], month)]
+        metadata = await asyncio.to_thread(_append_window, client, window, month, partition_key, result, decode, manifest, entry)
+        _report(context, landed, partition_key, metadata)
+    return failed
+
+def plan_calls(client: KnmiClient, partition_keys: Iterable[str]) -> Dict[Window, Dict[datetime, str]]:
+    """
+    Group the run's partitions per station and let the client's planner merge
+    contiguous months into as few API calls as the server tolerates.
+    Returns {call window: {month start: partition key}}.
+    """
+    by_station: Dict[str, Dict[datetime, str]] = defaultdict(dict)
+    for partition_key in partition_keys:
+        station_id, start_dt, _ = partition_window(partition_key)
+        by_station[station_id][start_dt] = partition_key
+
+    calls: Dict[Window, Dict[datetime, str]] = {}
+    for station_id, months in by_station.items():
+        for start, end, covered in client.planner.plan(months):
+            window = (station_id, start.strftime(API_TIME_FORMAT), end.strftime(API_TIME_FORMAT))
+            calls[window] = {month: months[month] for month in covered}
+    return calls
+
+async def _ingest(
+    context: AssetExecutionContext,
+    client: KnmiClient,
+    calls: Dict[Window, Dict[datetime, str]],
+    manifest: LandingManifest,
+    entries: Dict[PartitionRef, dict],
+    landed: Dict[str, dict],
+    conditional: Optional[Dict[Window, Dict[str, str]]] = None,
+) -> List[str]:
+    """
+    Fetch all calls concurrently (those in `conditional` as conditional
+    requests), slice each response back into monthly partitions and upload
+    them as soon as they arrive; their metadata is recorded in `landed`.
+    Returns the partition keys that failed.
+    """
+    settings = client.settings
+    if settings.KNMI_LANDING_FORMAT == "json":
+        decode = "json"
+    else:
+        decode = "table_json" if settings.KNMI_LANDING_KEEP_JSON else "table"
+
+    failed = []
+    retry_calls: Dict[Window, Dict[datetime, str]] = {}
+
+    async for window, result in client.fetch_many(calls, return_exceptions=True, decode=decode, conditional=conditional):
+        months = calls[window]
+        station_id = window[0]
+        if isinstance(result, Exception):
+            if len(months) > 1:
+                # Probably too large for the server: retry month by month
+                context.log.warning(f"Fetch failed for {window}, retrying per month: {result}")
+                for month, partition_key in months.items():
+                    month_window = (station_id, month.strftime(API_TIME_FORMAT), add_months(month, 1).strftime(API_TIME_FORMAT))
+                    retry_calls[month_window] = {month: partition_key}
+            else:
+                context.log.error(f"Fetch failed for {list(months.values())}: {result}")
+                failed.extend(months.values())
+            continue
+
+        if result is NOT_MODIFIED:
+            written = await asyncio.to_thread(_touch_window, client, window, months, manifest, entries)
+        else:
+            # Slice to exact [month start, next month start) windows and upload
+            written = await asyncio.to_thread(_land_window, client, window, months, result, decode, manifest, entries)
+        for partition_key, metadata in written.items():
+            _report(context, landed, partition_key, metadata)
+
+    if retry_calls:
+        failed.extend(await _ingest(context, client, retry_calls, manifest, entries, landed))
+    return failed
+
 @asset(
     partitions_def=knmi_partitions,
+    backfill_policy=BackfillPolicy.multi_run(max_partitions_per_run=MAX_PARTITIONS_PER_RUN),
     group_name="ingestion",
-    compute_kind="python"
+    compute_kind="python",
+    pool=KNMI_API_POOL,
 )
-def knmi_hourly_observations(context: AssetExecutionContext):
+def knmi_hourly_observations(context: AssetExecutionContext, config: IngestionConfig, knmi: KnmiClientResource) -> None:
     """
     Fetches hourly weather observations for a specific station and month.
     Partitioned by Station and Month.
+
+    A backfill run may cover many station-months; contiguous months of a station
+    are merged into multi-month calls, fetched concurrently through
+    `KnmiClient.fetch_many`, and each partition gets its own file and metadata.
+
+    Every partition's metadata carries the instrumentation of its API call
+    (rate-limit wait, DNS, connect, TTFB, download, decode, retries, 429s,
+    bytes) and of its own upload and manifest write.
+
+    The landing manifest makes reruns cheap: settled months are not fetched
+    at all, windows with stored validators are revalidated with a
+    conditional request, and unchanged content is not uploaded again.
+    Tag a run with `knmi/force_refetch=true` to bypass all of it.
+
+    With `incremental: true` (the hourly near-real-time schedule), partitions
+    of the current month that were landed before only fetch the hours after
+    their high-water mark and append them to the existing file.
+
+    If some partitions fail, the ones that landed are still materialized
+    and the run fails listing the rest.
     """
-    # 1. Parse Partition Key
-    partition = context.partition_key
-    # MultiPartition key format: MultiPartitionKey(keys_by_dimension={'station': '...', 'date': '...'})
-    # context.partition_key.keys_by_dimension is the proper way access it
-    
-    keys = partition.keys_by_dimension
-    station_id = keys["station"]
-    date_str = keys["date"] # e.g., "2023-01-01"
-    
-    logger.info(f"Processing Partition: Station={station_id}, Month={date_str}")
-    
-    # 2. Calculate Time Range (Start/End of Month)
-    # date_str is the start of the month
-    start_date = f"{date_str}T00:00:00Z"
-    
-    # Calculate end of month
-    # Quick trick: Parse to date, add month, subtract second?
-    # Or relying on Dagster's window?
-    time_window = context.partition_time_window
-    start_dt = time_window.start
-    end_dt = time_window.end
-    
-    # Format for API: ISO8601
-    # KNMI EDR usually accepts exact ISO strings
-    fmt = "%Y-%m-%dT%H:%M:%SZ"
-    t_start = start_dt.strftime(fmt)
-    # end_dt is exclusive (start of next month), so we want strictly less than, 
-    # or just pass start/end to API and hope it handles [start, end)?
-    # EDR 'datetime' interval is usually inclusive/inclusive or inclusive/exclusive depending on impl.
-    # Safest is to subtract 1 second for the API call if we want exact monthly boundaries?
-    # Actually, EDR standard is ISO8601 intervals. 
-    # Let's use the exact window start/end provided by Dagster.
-    t_end = end_dt.strftime(fmt)
-    
-    logger.info(f"Time Window: {t_start} -> {t_end}")
-    
-    # 3. Fetch Data
-    client = KnmiClient()
-    try:
-        data = client.fetch_data(station_id, t_start, t_end)
-    except Exception as e:
-        # If 404 or empty, what to do? 
-        # For now, fail the asset so we know.
-        raise e
-        
-    # 4. Save to S3 (Hive Style)
-    # Structure: source=knmi/type=hourly/station={id}/year={yyyy}/month={mm}/data.json
-    year = start_dt.year
-    month = start_dt.month
-    
-    # Pad month with zero
-    path = f"{client.settings.DATA_ROOT}/landing/source=knmi/type=hourly/station={station_id}/year={year}/month={month:02d}/data.json"
-    
-    fs = client.get_filesystem()
-    with fs.open(path, "w") as f:
-        json.dump(data, f)
-        
-    return Output(
-        value=path,
-        metadata={
-            "path": path,
-            "station": station_id,
-            "year": year,
-            "month": month,
-            "size_mb": fs.info(path)['size'] / 1024 / 1024
-        }
+    # Session, filesystem and rate limiter are shared per worker process, so
+    # consecutive runs reuse the same keep-alive connections and s3fs clients
+    client = knmi.get_client()
+    settings = client.settings
+    manifest = LandingManifest(client.get_filesystem(), settings.DATA_ROOT)
+
+    # 1. Check the manifest: settled months need no API call at all
+    partition_keys = context.partition_keys
+    refs = {}
+    for partition_key in partition_keys:
+        station_id, start_dt, _ = partition_window(partition_key)
+        refs[partition_key] = (station_id, start_dt)
+
+    force = context.run.tags.get(FORCE_REFETCH_TAG) == "true" or not settings.KNMI_LANDING_SKIP_UNCHANGED
+    entries = {} if force else manifest.load(refs.values())
+
+    # {partition key: metadata} of every partition that is in place
+    landed: Dict[str, dict] = {}
+    to_fetch = []
+    for partition_key, (station_id, start_dt) in refs.items():
+        entry = entries.get((station_id, start_dt))
+        if (
+            is_settled(entry, start_dt, settings.KNMI_LANDING_SETTLED_DAYS)
+            and entry["path"] == landing_target(settings, station_id, start_dt)
+        ):
+            _report(context, landed, partition_key, {
+                **_partition_metadata(settings, station_id, start_dt), **_entry_metadata(entry, "settled"),
+            })
+        else:
+            to_fetch.append(partition_key)
+
+    # 2. Incremental mode: current-month partitions with a high-water mark only append
+    append_calls = {}
+    if config.incremental:
+        now = datetime.now(timezone.utc)
+        appendable = {}
+        for partition_key in to_fetch:
+            station_id, start_dt = refs[partition_key]
+            entry = entries.get((station_id, start_dt))
+            if (
+                start_dt <= now < add_months(start_dt, 1)
+                and entry and entry.get("high_water_mark")
+                and entry["path"] == landing_target(settings, station_id, start_dt)
+            ):
+                appendable[partition_key] = (station_id, start_dt)
+        append_calls, current = plan_appends(appendable, entries, now)
+        for partition_key in current:
+            entry = entries[refs[partition_key]]
+            _report(context, landed, partition_key, {
+                **_partition_metadata(settings, *refs[partition_key]), **_entry_metadata(entry, "up_to_date"),
+            })
+        to_fetch = [pk for pk in to_fetch if pk not in appendable]
+
+    # 3. Revalidate stored windows, resolve the rest into as few API windows as possible
+    # end_dt is exclusive (start of next month); EDR takes ISO8601 intervals,
+    # and the response is sliced back to exact month boundaries.
+    calls, conditional, rest = plan_revalidations(to_fetch, entries)
+    calls.update(plan_calls(client, rest))
+    logger.info(
+        f"Processing {len(partition_keys)} partition(s): {len(partition_keys) - len(to_fetch) - len(append_calls)} skipped, "
+        f"{len(append_calls)} appended, {len(to_fetch)} in {len(calls)} API call(s)"
+    )
+
+    # 4. Fetch & save to S3 (Hive Style)
+    async def _run() -> List[str]:
+        failed = await _append(context, client, append_calls, manifest, entries, landed) if append_calls else []
+        return failed + await _ingest(context, client, calls, manifest, entries, landed, conditional)
+
+    failed = asyncio.run(_run())
+
+    # 5. Run totals: logged, and exported for Prometheus if configured
+    context.log.info(f"Ingestion metrics: {client.metrics.as_metadata()}")
+    export_metrics(
+        client.metrics,
+        settings.KNMI_METRICS_TEXTFILE,
+        settings.KNMI_METRICS_PUSHGATEWAY_URL,
+        job="knmi_hourly_observations",
+        extra={"partitions": len(partition_keys), "api_calls": len(calls) + len(append_calls), "failed_partitions": len(failed)},
     )
+
+    # If 404 or empty, what to do?
+    # For now, fail the asset so we know. A failed step records no
+    # materializations, so first report the partitions that did land:
+    # bronze only picks up materialized landing partitions, and the next
+    # run then only has to retry the failed ones.
+    if failed:
+        for partition_key, metadata in landed.items():
+            context.log_event(AssetMaterialization(asset_key=context.asset_key, partition=partition_key, metadata=metadata))
+        raise Failure(
+            description=f"{len(failed)} of {len(partition_keys)} partition(s) failed to ingest",
+            metadata={"failed_partitions": ", ".join(sorted(failed))},
+        )
@@ -1,38 +1,74 @@
+import io
 import json
-from dagster import asset, Output
-from src.utils.smart_client import KnmiClient
+from dagster import asset, MaterializeResult, Output
+from tenacity import Retrying
+from src.assets.ingestion import KNMI_API_POOL
+from src.resources import KnmiClientResource
+from src.utils.smart_client import RETRY_POLICY, KnmiSettings
+from src.utils.storage import LandingWriter, TeeWriter, compressed_name, open_landing
 
-@asset
-def raw_stations_list() -> Output[list[str]]:
+def stations_path(settings: KnmiSettings) -> str:
+    """
+    Location of the raw station GeoJSON (suffix follows KNMI_LANDING_COMPRESSION).
+    """
+    return f"{settings.DATA_ROOT}/metadata/{compressed_name('stations.json', settings.KNMI_LANDING_COMPRESSION)}"
+
+def station_ids_from_geojson(geojson: dict) -> list[str]:
+    """
+    Station IDs from the locations GeoJSON FeatureCollection.
+    We must use the official API 'id' (e.g., '0-20000-0-06201') for subsequent calls to work.
+    """
+    from src.utils.stations import stations_table
+
+    return stations_table(geojson).column("station").to_pylist()
+
+@asset(pool=KNMI_API_POOL)
+def raw_stations_list(knmi: KnmiClientResource) -> Output[list[str]]:
     """
     Fetches the list of KNMI weather stations and saves metadata to S3.
     Returns a list of station IDs to be used for dynamic partitions.
     """
-    client = KnmiClient()
-    
-    # 1. Fetch locations
-    geojson = client.fetch_locations()
+    client = knmi.get_client()
     
-    # 2. Save to S3/MinIO
-    save_path = f"{client.settings.DATA_ROOT}/metadata/stations.json"
-    
-    # Use fsspec filesystem to write
-    with client.get_filesystem().open(save_path, "w") as f:
-        json.dump(geojson, f)
+    # 1. Fetch locations and 2. Save to S3/MinIO
+    # The response body is streamed straight into the (compressed) object;
+    # a copy is kept in memory only to extract the station IDs. Each attempt
+    # starts a new object and buffer (a failed one discards its upload).
+    save_path = stations_path(client.settings)
+    for attempt in Retrying(**RETRY_POLICY):
+        with attempt:
+            buffer = io.BytesIO()
+            with LandingWriter(client.get_filesystem(), save_path, client.settings.KNMI_LANDING_COMPRESSION) as writer:
+                client.download_locations(TeeWriter(writer, buffer))
+    geojson = json.loads(buffer.getvalue())
         
     # 3. Extract IDs
-    # GeoJSON FeatureCollection: features -> id or properties
-    station_ids = []
-    if "features" in geojson:
-        for feature in geojson["features"]:
-            # We must use the official API 'id' (e.g., '0-20000-0-06201') for subsequent calls to work.
-            s_id = feature.get("id")
-            if not s_id:
-                # Fallback to properties if 'id' is missing (unlikely for valid GeoJSON)
-                props = feature.get("properties", {})
-                s_id = props.get("stationId") or props.get("wmoId")
-            
-            if s_id:
-                station_ids.append(str(s_id))
+    station_ids = station_ids_from_geojson(geojson)
                 
-    return Output(value=station_ids)
+    return Output(value=station_ids, metadata={"stations_file": save_path, "size_mb": writer.bytes_written / 1024 / 1024})
+
+@asset(deps=[raw_stations_list])
+def station_index(knmi: KnmiClientResource) -> MaterializeResult:
+    """
+    Compact station table (id, WMO id, name, coordinates, active period) as
+    Parquet, so consumers resolve stations via `load_station_index` instead
+    of re-downloading and reparsing the GeoJSON.
+    """
+    import pyarrow.parquet as pq
+    from src.utils.stations import StationIndex, station_index_path, stations_table
+
+    client = knmi.get_client()
+    fs = client.get_filesystem()
+
+    with open_landing(fs, stations_path(client.settings)) as f:
+        table = stations_table(json.load(f))
+
+    index = StationIndex(table)
+    save_path = station_index_path(client.settings.DATA_ROOT)
+    with fs.open(save_path, "wb") as f:
+        pq.write_table(index.table, f, compression="zstd")
+
+    return MaterializeResult(metadata={
+        "path": save_path,
+        "stations": len(index),
+    })
@@ -0,0 +1,147 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, Tuple
+from dagster import (
+    asset,
+    AssetExecutionContext,
+    AssetKey,
+    AutomationCondition,
+    Failure,
+    MaterializeResult,
+)
+from src.assets.bronze import bronze_path
+from src.assets.ingestion import monthly_partitions
+from src.utils.landing_manifest import json_digest, utc_now
+from src.resources import KnmiClientResource
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Configure Logging
+logger = logging.getLogger(__name__)
+
+# Silver is bronze deduplicated on (station, timestamp) and laid on a complete
+# hourly grid: every station has one row per hour of the month.
+# Structure: silver/source=knmi/type=hourly/year={yyyy}/month={mm}/data.parquet
+BRONZE_ASSET = AssetKey("bronze_observations")
+SILVER_ROW_GROUP_SIZE = 256 * 1024
+
+def silver_path(data_root: str, month: datetime, filename: str = "data.parquet") -> str:
+    return f"{data_root}/silver/source=knmi/type=hourly/year={month.year}/month={month.month:02d}/{filename}"
+
+def source_digest(fs, manifest_path: str) -> Optional[str]:
+    """
+    Digest of an upstream manifest: it changes exactly when the upstream data does.
+    """
+    if not fs.exists(manifest_path):
+        return None
+    with fs.open(manifest_path, "r") as f:
+        return json_digest(json.load(f))
+
+def is_current(fs, manifest_path: str, data_path: str, digest: str) -> bool:
+    """
+    True if the derived file was built from the upstream state with this digest.
+    """
+    if not fs.exists(manifest_path) or not fs.exists(data_path):
+        return False
+    with fs.open(manifest_path, "r") as f:
+        return json.load(f).get("source_digest") == digest
+
+def write_with_manifest(fs, data_path: str, manifest_path: str, table: "pa.Table", digest: str, **parquet_options) -> int:
+    """
+    Write data first, manifest last (the manifest is the commit point).
+    """
+    import pyarrow.parquet as pq
+
+    with fs.open(data_path, "wb") as f:
+        pq.write_table(table, f, compression="zstd", write_statistics=True, **parquet_options)
+        size = f.tell()
+    with fs.open(manifest_path, "w") as f:
+        json.dump({"source_digest": digest, "rows": table.num_rows, "built_at": utc_now()}, f, indent=2, sort_keys=True)
+    return size
+
+def dedup_and_fill(table: "pa.Table", start: datetime, end: datetime) -> Tuple["pa.Table", int, int]:
+    """
+    Restrict to [start, end), keep one row per (station, timestamp) and
+    left-join onto a full hourly grid of every station.
+
+    Everything is sorted by (station, timestamp), so dedup is a pass over
+    adjacent rows and the grid join preserves order. Hours without any
+    record get `is_gap = true` and null parameters.
+
+    Returns (table, duplicates dropped, gap hours).
+    """
+    import polars as pl
+    from src.utils.coverage import TIMESTAMP_TYPE
+
+    df = pl.from_arrow(table).filter((pl.col("timestamp") >= start) & (pl.col("timestamp") < end))
+    rows = df.height
+    # Stable sort: among duplicates the row that came last in bronze wins
+    df = (
+        df.sort(["station", "timestamp"], maintain_order=True)
+        .unique(subset=["station", "timestamp"], keep="last", maintain_order=True)
+        .with_columns(pl.lit(False).alias("is_gap"))
+    )
+    duplicates = rows - df.height
+
+    hours = pl.datetime_range(start, end, "1h", closed="left", time_unit=df.schema["timestamp"].time_unit, time_zone="UTC", eager=True)
+    grid = df.select("station").unique().sort("station").join(hours.alias("timestamp").to_frame(), how="cross")
+    filled = grid.join(df, on=["station", "timestamp"], how="left", maintain_order="left").with_columns(
+        pl.col("is_gap").fill_null(True)
+    )
+    gaps = filled.height - df.height
+
+    result = filled.to_arrow()
+    index = result.schema.get_field_index("timestamp")
+    return result.set_column(index, "timestamp", result["timestamp"].cast(TIMESTAMP_TYPE)), duplicates, gaps
+
+@asset(
+    partitions_def=monthly_partitions,
+    deps=[BRONZE_ASSET],
+    group_name="silver",
+    compute_kind="polars",
+    automation_condition=AutomationCondition.eager(),
+)
+def silver_observations(context: AssetExecutionContext, knmi: KnmiClientResource) -> MaterializeResult:
+    """
+    Deduplicated, gap-filled hourly series for one month of all stations.
+
+    The running month is gridded up to the current hour only, so hours not
+    yet published are not reported as gaps.
+    """
+    import pyarrow.parquet as pq
+
+    client = knmi.get_client()
+    fs = client.get_filesystem()
+    window = context.partition_time_window
+    month = window.start
+    data_root = client.settings.DATA_ROOT
+    data_path = silver_path(data_root, month)
+    manifest_path = silver_path(data_root, month, "_manifest.json")
+
+    digest = source_digest(fs, bronze_path(data_root, month, "_manifest.json"))
+    if digest is None:
+        raise Failure(f"Bronze {month:%Y-%m} has not been materialized")
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end = min(window.end, now)
+    # The grid end moves every hour in the running month
+    digest = json_digest({"bronze": digest, "end": end.isoformat()})
+    if is_current(fs, manifest_path, data_path, digest):
+        logger.info(f"Silver {month:%Y-%m} is up to date")
+        return MaterializeResult(metadata={"path": data_path, "recomputed": False})
+
+    with fs.open(bronze_path(data_root, month), "rb") as f:
+        bronze = pq.read_table(f)
+    table, duplicates, gaps = dedup_and_fill(bronze, month, end)
+    size = write_with_manifest(fs, data_path, manifest_path, table, digest, row_group_size=SILVER_ROW_GROUP_SIZE)
+
+    logger.info(f"Silver {month:%Y-%m}: {table.num_rows} rows, {duplicates} duplicates dropped, {gaps} gap hours")
+    return MaterializeResult(metadata={
+        "path": data_path,
+        "recomputed": True,
+        "rows": table.num_rows,
+        "duplicates_dropped": duplicates,
+        "gap_hours": gaps,
+        "size_mb": size / 1024 / 1024,
+    })
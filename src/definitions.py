@@ -1,20 +1,26 @@
 import logging
 from dagster import (
+    AssetRecordsFilter,
     Definitions,
     DynamicPartitionsDefinition,
     SensorDefinition,
     SensorEvaluationContext,
     AssetSelection,
     define_asset_job,
+    in_process_executor,
     RunRequest,
+    ScheduleEvaluationContext,
+    SensorResult,
     SkipReason,
     job,
-    op
+    op,
+    schedule,
 )
 from dagster import load_assets_from_modules
 
-from src.assets import metadata, ingestion
+from src.assets import metadata, ingestion, bronze, silver, gold
 from src.partitions import knmi_stations_def
+from src.resources import DuckDBQueryEngine, KnmiClientResource
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -26,6 +32,9 @@ logger = logging.getLogger(__name__)
 # 2. Load Assets
 metadata_assets = load_assets_from_modules([metadata])
 ingestion_assets = load_assets_from_modules([ingestion])
+bronze_assets = load_assets_from_modules([bronze])
+silver_assets = load_assets_from_modules([silver])
+gold_assets = load_assets_from_modules([gold])
 
 # 3. Define Sensor to update partitions
 # This sensor watches for the completion of the 'raw_stations_list' asset
@@ -39,77 +48,62 @@ def update_stations_partition_job():
     # For updating partitions *based on asset materialization*, we use an automation sensor.
     pass
 
-def stations_sensor_fn(context: SensorEvaluationContext):
+def stations_sensor_fn(context: SensorEvaluationContext, knmi: KnmiClientResource):
     """
     Listen for materializations of 'raw_stations_list'.
-    When it updates, read the station IDs and update the dynamic partition.
+    When it updates, read the station IDs and register the new ones in the
+    dynamic partition (and, with KNMI_RETIRE_STATIONS, drop vanished ones).
+
+    The cursor is the storage id of the last processed materialization, so a
+    tick without a new materialization is a single indexed event-log query.
     """
-    # Get the last materialization of the asset
-    asset_key = metadata.raw_stations_list.key
-    cursor = context.cursor or None
-    
-    # Check for new materializations since the cursor
-    events = context.instance.get_event_records(
-        event_records_filter=None, # Filter logic handled by cursor usually, simplified here
-        ascending=False,
-        limit=1
-    )
-    
-    # Correct way to query for asset materialization is using `context.instance.get_latest_materialization_event(asset_key)`
-    # But standard sensor pattern for assets is simpler.
-    
-    # Let's stick to the plan: "Sensor listening to raw_stations_list"
-    # We can check if the asset has been materialized recently.
-    
-    # Alternative: Simply load the file from S3 if we want to be decoupled?
-    # No, better to use Dagster's event log.
-    
-    # Simplified approach for "Step 3":
-    # We'll assume this sensor runs periodically. It checks if the partition set needs updating.
-    # Since `raw_stations_list` returns the list of IDs, we can inspect its latest output value?
-    # Accessing output values from a sensor is tricky/expensive (requires I/O manager).
-    
-    # Better Approach: 
-    # The `raw_stations_list` asset writes to S3: `metadata/stations.json`.
-    # The sensor can just read that file using our SmartClient!
-    
-    from src.utils.smart_client import KnmiClient
+    from src.utils.storage import open_landing
     import json
-    
+
+    # 1. Anything new since the cursor?
+    after = int(context.cursor) if context.cursor else None
+    records = context.instance.fetch_materializations(
+        AssetRecordsFilter(asset_key=metadata.raw_stations_list.key, after_storage_id=after),
+        limit=1,
+        ascending=False,
+    ).records
+    if not records:
+        return SkipReason("No new materialization of 'raw_stations_list'")
+    record = records[0]
+
+    # 2. Read the stations file written by that materialization
     try:
-        client = KnmiClient()
-        path = f"{client.settings.DATA_ROOT}/metadata/stations.json"
-        fs = client.get_filesystem()
-        
-        if not fs.exists(path):
-            return SkipReason(f"Stations metadata file not found at {path}")
-            
-        # Check modification time to see if we need to update?
-        # Or just always try to add (idempotent).
-        
-        with fs.open(path, "r") as f:
-            geojson = json.load(f)
-            
-        new_keys = []
-        if "features" in geojson:
-            for feature in geojson["features"]:
-                s_id = feature.get("id")
-                if not s_id:
-                    props = feature.get("properties", {})
-                    s_id = props.get("stationId") or props.get("wmoId")
-                if s_id:
-                    new_keys.append(str(s_id))
-        
-        if new_keys:
-            context.instance.add_dynamic_partitions(knmi_stations_def.name, new_keys)
-            return SkipReason(f"Updated {len(new_keys)} stations in partition '{knmi_stations_def.name}'")
-            
-        return SkipReason("No stations found in metadata file.")
-        
+        client = knmi.get_client()
+        path_value = record.asset_materialization.metadata.get("stations_file")
+        path = path_value.value if path_value is not None else metadata.stations_path(client.settings)
+        with open_landing(client.get_filesystem(), path) as f:
+            station_ids = set(metadata.station_ids_from_geojson(json.load(f)))
     except Exception as e:
+        # Cursor is not advanced, so the next tick retries
         logger.error(f"Sensor failed: {e}")
         return SkipReason(f"Sensor failed: {e}")
 
+    if not station_ids:
+        return SensorResult(cursor=str(record.storage_id), skip_reason="No stations found in metadata file.")
+
+    # 3. Diff against the registered partitions
+    existing = set(context.instance.get_dynamic_partitions(knmi_stations_def.name))
+    added = sorted(station_ids - existing)
+    retired = sorted(existing - station_ids) if client.settings.KNMI_RETIRE_STATIONS else []
+
+    requests = []
+    if added:
+        requests.append(knmi_stations_def.build_add_request(added))
+    if retired:
+        requests.append(knmi_stations_def.build_delete_request(retired))
+    context.log.info(f"Stations: {len(added)} added, {len(retired)} retired, {len(existing)} registered before")
+
+    return SensorResult(
+        dynamic_partitions_requests=requests,
+        cursor=str(record.storage_id),
+        skip_reason=None if requests else "Station list unchanged.",
+    )
+
 # Create the sensor definition
 stations_sensor = SensorDefinition(
     name="stations_update_sensor",
@@ -117,8 +111,62 @@ stations_sensor = SensorDefinition(
     minimum_interval_seconds=60 * 60, # Check every hour
 )
 
-# 4. Final Definitions
+# 4. Near-real-time refresh of the running month
+# Every hour, each station's current-month partition appends the hours after
+# its high-water mark; bronze recompacts the month half an hour later.
+# Both are a single light step, so they run in the run worker itself instead
+# of paying for a step subprocess.
+knmi_nrt_job = define_asset_job(
+    "knmi_nrt_job",
+    selection=AssetSelection.assets(ingestion.knmi_hourly_observations),
+    executor_def=in_process_executor,
+    tags={ingestion.KNMI_API_RUN_TAG: "nrt"},
+)
+
+bronze_nrt_job = define_asset_job(
+    "bronze_nrt_job",
+    selection=AssetSelection.assets(bronze.bronze_observations),
+    executor_def=in_process_executor,
+)
+
+# Launch landing backfills from this job: its runs carry the API run tag, so
+# dagster.yaml caps how many of them hit the KNMI API at once
+knmi_ingestion_job = define_asset_job(
+    "knmi_ingestion_job",
+    selection=AssetSelection.assets(ingestion.knmi_hourly_observations),
+    tags={ingestion.KNMI_API_RUN_TAG: "backfill"},
+)
+
+@schedule(cron_schedule="10 * * * *", job=knmi_nrt_job, execution_timezone="UTC")
+def knmi_nrt_schedule(context: ScheduleEvaluationContext):
+    """
+    One run covering the current month of every station, in incremental mode.
+    """
+    month = context.scheduled_execution_time.strftime("%Y-%m-01")
+    keys = [
+        key for key in ingestion.knmi_partitions.get_partition_keys(dynamic_partitions_store=context.instance)
+        if key.startswith(f"{month}|")
+    ]
+    if not keys:
+        return SkipReason(f"No station partitions for {month} yet")
+    # Keys are date-major, so one month of all stations is a contiguous range
+    return RunRequest(
+        run_config={"ops": {"knmi_hourly_observations": {"config": {"incremental": True}}}},
+        tags={
+            "dagster/asset_partition_range_start": keys[0],
+            "dagster/asset_partition_range_end": keys[-1],
+        },
+    )
+
+@schedule(cron_schedule="40 * * * *", job=bronze_nrt_job, execution_timezone="UTC")
+def bronze_nrt_schedule(context: ScheduleEvaluationContext):
+    return RunRequest(partition_key=context.scheduled_execution_time.strftime("%Y-%m-01"))
+
+# 5. Final Definitions
 defs = Definitions(
-    assets=[*metadata_assets, *ingestion_assets],
+    assets=[*metadata_assets, *ingestion_assets, *bronze_assets, *silver_assets, *gold_assets],
+    jobs=[knmi_nrt_job, bronze_nrt_job, knmi_ingestion_job],
+    schedules=[knmi_nrt_schedule, bronze_nrt_schedule],
     sensors=[stations_sensor],
+    resources={"duckdb": DuckDBQueryEngine(), "knmi": KnmiClientResource()},
 )
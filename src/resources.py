@@ -0,0 +1,209 @@
+import os
+import logging
+import functools
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from dagster import ConfigurableResource
+from pydantic import Field
+
+from src.utils.smart_client import KnmiClient, KnmiSettings, get_settings
+
+# DuckDB is imported when the first connection is built, not with the code location
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LANDING_PREFIX = "landing/source=knmi/type=hourly"
+BRONZE_PREFIX = "bronze/source=knmi/type=hourly"
+GOLD_PREFIX = "gold/source=knmi"
+
+# Partition columns come from the path; cast them instead of reading '01' as text
+HIVE_TYPES = "{'year': INTEGER, 'month': INTEGER}"
+
+def _storage_secret(settings: KnmiSettings) -> Optional[str]:
+    """
+    CREATE SECRET statement giving httpfs access to DATA_ROOT, or None for
+    local paths. MinIO (ENDPOINT_URL set) needs path-style URLs.
+    """
+    protocol = settings.DATA_ROOT.split("://")[0] if "://" in settings.DATA_ROOT else "file"
+    if protocol not in ("s3", "gs", "gcs"):
+        return None
+
+    options = {"TYPE": "gcs" if protocol in ("gs", "gcs") else "s3"}
+    if settings.AWS_ACCESS_KEY_ID:
+        # For GCS these are HMAC interoperability keys
+        options["KEY_ID"] = settings.AWS_ACCESS_KEY_ID
+        options["SECRET"] = settings.AWS_SECRET_ACCESS_KEY or ""
+    if settings.ENDPOINT_URL and options["TYPE"] == "s3":
+        endpoint = urlparse(settings.ENDPOINT_URL)
+        options["ENDPOINT"] = endpoint.netloc or endpoint.path
+        options["USE_SSL"] = "true" if endpoint.scheme == "https" else "false"
+        options["URL_STYLE"] = "path"
+    body = ", ".join(
+        f"{key} {value}" if value in ("true", "false") or key == "TYPE" else f"{key} '{value}'"
+        for key, value in options.items()
+    )
+    return f"CREATE OR REPLACE SECRET knmi_storage ({body})"
+
+def landing_globs(data_root: str, stations: Optional[Iterable[str]] = None, years: Optional[Iterable[int]] = None) -> List[str]:
+    """
+    Globs over the landing Parquet files, narrowed to the given stations and
+    years. On object stores DuckDB lists only the prefix before the first
+    wildcard, so a narrowed glob never enumerates the rest of the bucket.
+    """
+    stations = list(stations) if stations is not None else ["*"]
+    years = list(years) if years is not None else ["*"]
+    return [
+        f"{data_root}/{LANDING_PREFIX}/station={station}/year={year}/month=*/*.parquet"
+        for station in stations
+        for year in years
+    ]
+
+def bronze_globs(data_root: str, years: Optional[Iterable[int]] = None) -> List[str]:
+    years = list(years) if years is not None else ["*"]
+    return [f"{data_root}/{BRONZE_PREFIX}/year={year}/month=*/data.parquet" for year in years]
+
+def parquet_scan(globs: List[str]) -> str:
+    """
+    read_parquet() over hive-partitioned files. Filters on station/year/month
+    prune files before any is opened, and only selected columns are fetched.
+    Stations report different parameter sets, hence union_by_name.
+    """
+    files = "[" + ", ".join(f"'{glob}'" for glob in globs) + "]"
+    return f"read_parquet({files}, hive_partitioning = true, hive_types = {HIVE_TYPES}, union_by_name = true)"
+
+def create_views(conn: "duckdb.DuckDBPyConnection", settings: KnmiSettings) -> List[str]:
+    """
+    (Re)create the lakehouse views. A layer with no files yet is skipped;
+    the views glob at query time, so new partitions show up without a refresh.
+    """
+    import duckdb
+
+    data_root = settings.DATA_ROOT
+    views = {}
+    # JSON landing files are raw CoverageJSON documents, not hourly rows;
+    # bronze_hourly is the tabular view of them
+    if settings.KNMI_LANDING_FORMAT == "parquet":
+        views["landing_hourly"] = parquet_scan(landing_globs(data_root))
+    views |= {
+        "bronze_hourly": parquet_scan(bronze_globs(data_root)),
+        "silver_hourly": parquet_scan([f"{data_root}/silver/source=knmi/type=hourly/year=*/month=*/data.parquet"]),
+        "stations": f"read_parquet('{data_root}/metadata/stations.parquet', hive_partitioning = false)",
+        "gold_daily": parquet_scan([f"{data_root}/{GOLD_PREFIX}/type=daily/year=*/month=*/data.parquet"]),
+        "gold_monthly": parquet_scan([f"{data_root}/{GOLD_PREFIX}/type=monthly/year=*/month=*/data.parquet"]),
+        "gold_climatology": f"read_parquet('{data_root}/{GOLD_PREFIX}/type=climatology/data.parquet', hive_partitioning = false)",
+    }
+    created = []
+    for name, source in views.items():
+        try:
+            conn.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {source}")
+            created.append(name)
+        except duckdb.IOException as e:
+            logger.info(f"DuckDB view '{name}' not created yet: {e}")
+    return created
+
+def configure_connection(conn: "duckdb.DuckDBPyConnection", settings: KnmiSettings) -> None:
+    secret = _storage_secret(settings)
+    if secret is not None:
+        conn.execute("INSTALL httpfs")
+        conn.execute("LOAD httpfs")
+        conn.execute(secret)
+    # Keep Parquet footers and object HEADs of immutable files across queries
+    conn.execute("SET parquet_metadata_cache = true")
+    conn.execute("SET enable_http_metadata_cache = true")
+    create_views(conn, settings)
+
+@functools.lru_cache(maxsize=None)
+def _build_connection(pid: int, database: str, threads: Optional[int]) -> "duckdb.DuckDBPyConnection":
+    """
+    Configured connection, cached per process id like the HTTP session:
+    extensions, credentials and views are set up once per worker.
+    """
+    import duckdb
+
+    config = {"threads": threads} if threads else {}
+    conn = duckdb.connect(database, config=config)
+    configure_connection(conn, get_settings())
+    logger.debug(f"Created DuckDB connection (pid={pid}, database={database})")
+    return conn
+
+class DuckDBQueryEngine(ConfigurableResource):
+    """
+    Shared DuckDB engine over DATA_ROOT with views on the Hive layout:
+
+    - landing_hourly: landing Parquet files (station, year, month partitions);
+      only registered when KNMI_LANDING_FORMAT=parquet
+    - bronze_hourly: compacted monthly bronze files (year, month partitions)
+    - silver_hourly: deduplicated hourly grid with `is_gap` markers
+    - stations: the station index
+    - gold_daily, gold_monthly, gold_climatology: the pre-aggregated rollups
+
+    The connection persists for the life of the process; each caller gets its
+    own cursor, so threads can query concurrently.
+    """
+    database: str = Field(":memory:", description="DuckDB database file; ':memory:' keeps only views and caches")
+    threads: Optional[int] = Field(None, description="DuckDB worker threads (default: all cores)")
+
+    def get_connection(self) -> "duckdb.DuckDBPyConnection":
+        return _build_connection(os.getpid(), self.database, self.threads).cursor()
+
+    def refresh_views(self) -> List[str]:
+        """
+        Create views for layers that had no files when the connection was built.
+        """
+        return create_views(_build_connection(os.getpid(), self.database, self.threads), get_settings())
+
+    def query(self, sql: str, params: Optional[list] = None) -> "pa.Table":
+        import duckdb
+
+        try:
+            return self.get_connection().execute(sql, params).to_arrow_table()
+        except duckdb.CatalogException:
+            # A layer may have been materialized since the views were built
+            if not self.refresh_views():
+                raise
+            return self.get_connection().execute(sql, params).to_arrow_table()
+
+    def scan_landing(
+        self,
+        stations: Optional[Iterable[str]] = None,
+        years: Optional[Iterable[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> "duckdb.DuckDBPyRelation":
+        """
+        Relation over only the landing objects of the given stations and years.
+        """
+        select = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        source = parquet_scan(landing_globs(get_settings().DATA_ROOT, stations, years))
+        return self.get_connection().sql(f"SELECT {select} FROM {source}")
+
+@functools.lru_cache(maxsize=None)
+def _client_settings(settings: KnmiSettings, overrides: Tuple[Tuple[str, Any], ...]) -> KnmiSettings:
+    return settings.model_copy(update=dict(overrides)) if overrides else settings
+
+class KnmiClientResource(ConfigurableResource):
+    """
+    KNMI API client and DATA_ROOT filesystem for assets and sensors.
+
+    Settings, HTTP session, filesystem (s3fs/aiobotocore clients included),
+    rate limiter and window planner are built once per process and shared
+    by every client handed out, across assets, runs and sensor ticks.
+    Each `get_client()` call still gets its own per-run state (validators,
+    metrics). Unset fields fall back to the environment.
+    """
+    max_concurrency: Optional[int] = Field(None, description="Max in-flight requests for fetch_many (default: KNMI_MAX_CONCURRENCY)")
+    rate_limit_per_second: Optional[float] = Field(None, description="Sustained requests per second (default: KNMI_RATE_LIMIT_PER_SECOND)")
+    rate_limit_burst: Optional[float] = Field(None, description="Requests that may be issued back-to-back (default: KNMI_RATE_LIMIT_BURST)")
+
+    def get_client(self) -> KnmiClient:
+        overrides = {
+            "KNMI_MAX_CONCURRENCY": self.max_concurrency,
+            "KNMI_RATE_LIMIT_PER_SECOND": self.rate_limit_per_second,
+            "KNMI_RATE_LIMIT_BURST": self.rate_limit_burst,
+        }
+        settings = _client_settings(get_settings(), tuple(sorted((k, v) for k, v in overrides.items() if v is not None)))
+        return KnmiClient(settings)
@@ -0,0 +1,281 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+import ijson
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.utils.window_planner import parse_time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_TYPE = pa.timestamp("s", tz="UTC")
+
+# CoverageJSON NdArray dataType -> Arrow type
+ARROW_TYPES = {
+    "float": pa.float64(),
+    "integer": pa.int64(),
+    "string": pa.string(),
+}
+
+class _Coverage:
+    def __init__(self):
+        self.timestamps: Optional[pa.Array] = None
+        self.regular_axis: Dict[str, Any] = {}
+        self.data_types: Dict[str, str] = {}
+        self.ranges: Dict[str, pa.Array] = {}
+        # Values read before their parameter's dataType
+        self.pending: Dict[str, List[Any]] = {}
+
+    def set_type(self, name: str, data_type: str) -> None:
+        self.data_types[name] = data_type
+        if name in self.pending:
+            self.add_values(name, self.pending.pop(name))
+
+    def add_values(self, name: str, values: List[Any]) -> None:
+        if name not in self.data_types:
+            # JSON objects are unordered: hold the values until the type is known
+            self.pending[name] = values
+            return
+        self.ranges[name] = _range_array(values, ARROW_TYPES.get(self.data_types[name], pa.float64()))
+
+    def finish(self) -> None:
+        # No dataType at all: float, as in `coverage_to_table`
+        for name, values in self.pending.items():
+            self.ranges[name] = _range_array(values, pa.float64())
+        self.pending = {}
+
+    def resolve_timestamps(self) -> Optional[pa.Array]:
+        if self.timestamps is None and "num" in self.regular_axis:
+            self.timestamps = time_axis(self.regular_axis)
+        return self.timestamps
+
+def time_axis(axis: Dict[str, Any]) -> pa.Array:
+    """
+    Expand a CoverageJSON time axis into a timestamp array. Handles both
+    listed axes (`values`) and regular ones (`start`/`stop`/`num`) without
+    a Python-level loop: ISO strings are parsed by Arrow's C++ kernels.
+    """
+    if "values" in axis:
+        return pc.cast(pa.array(axis["values"], pa.string()), TIMESTAMP_TYPE)
+    num = int(axis["num"])
+    bounds = pc.cast(pa.array([axis["start"], axis["stop"]], pa.string()), TIMESTAMP_TYPE)
+    start, stop = bounds.cast(pa.int64()).to_numpy()
+    seconds = np.linspace(start, stop, num, dtype=np.int64) if num > 1 else np.array([start] * num, np.int64)
+    return pa.array(seconds, pa.int64()).cast(TIMESTAMP_TYPE)
+
+def _range_array(values: List[Any], arrow_type: pa.DataType, missing: Optional[Iterable[Any]] = None) -> pa.Array:
+    """
+    Typed array with nulls (and any sentinel fill values) masked.
+    """
+    # Arrow unboxes the list itself (None -> null; JSON has no NaN). Going
+    # through NumPy first is ~5x slower once the list holds None.
+    array = pa.array(values, type=arrow_type)
+    if missing:
+        mask = pc.is_in(array, value_set=pa.array(list(missing), arrow_type))
+        array = pc.if_else(mask, pa.scalar(None, arrow_type), array)
+    return array
+
+def _read_array(events) -> List[Any]:
+    """
+    Consume events up to the matching end_array and return the flat values.
+    Tight inner loop: this is where almost all of the parse time goes.
+    """
+    values: List[Any] = []
+    append = values.append
+    for _, event, value in events:
+        if event == "end_array":
+            break
+        append(value)
+    return values
+
+def stream_coverage_table(source: BinaryIO, station_id: Optional[str] = None) -> pa.Table:
+    """
+    Decode a CoverageJSON CoverageCollection stream (file object or raw HTTP
+    body) into a columnar table: `timestamp`, `station` and one column per
+    parameter.
+
+    The document is never materialized. ijson tokenizes the stream
+    incrementally and each `values` array is converted to a typed Arrow
+    array as soon as it closes (or, if `dataType` comes after `values`, as
+    soon as the type is read), so about one parameter's values exist as
+    Python objects at any time (nulls become Arrow nulls).
+    """
+    coverages: List[_Coverage] = []
+    current: Optional[_Coverage] = None
+
+    events = ijson.parse(source, use_float=True)
+    for prefix, event, value in events:
+        if prefix == "coverages.item" and event == "start_map":
+            current = _Coverage()
+            coverages.append(current)
+        elif prefix == "coverages.item" and event == "end_map":
+            current.finish()
+            current = None
+        elif current is None:
+            continue
+        elif event == "start_array" and prefix == "coverages.item.domain.axes.t.values":
+            current.timestamps = time_axis({"values": _read_array(events)})
+        elif prefix in ("coverages.item.domain.axes.t.start", "coverages.item.domain.axes.t.stop", "coverages.item.domain.axes.t.num"):
+            current.regular_axis[prefix.rpartition(".")[2]] = value
+        elif prefix.startswith("coverages.item.ranges."):
+            # coverages.item.ranges.<param>.dataType / coverages.item.ranges.<param>.values
+            name, _, field = prefix[len("coverages.item.ranges."):].rpartition(".")
+            if field == "dataType":
+                current.set_type(name, value)
+            elif field == "values" and event == "start_array":
+                current.add_values(name, _read_array(events))
+
+    return _combine([_coverage_table(c, station_id) for c in coverages if c.resolve_timestamps() is not None])
+
+def coverage_to_table(data: Dict[str, Any], station_id: Optional[str] = None, missing_values: Optional[Dict[str, Iterable[Any]]] = None) -> pa.Table:
+    """
+    Decode an already-parsed CoverageJSON document (a single Coverage or a
+    CoverageCollection) into the same columnar layout as
+    `stream_coverage_table`: `timestamp`, `station`, one column per parameter.
+
+    Each axis and range is converted with one Arrow call instead of a Python
+    loop per value; nulls become validity masks and `missing_values`
+    ({param: sentinels}) are masked too. Each parameter is cast to its
+    declared `dataType`.
+    """
+    coverages = data.get("coverages", [data] if "domain" in data else [])
+    tables = []
+    for raw in coverages:
+        coverage = _Coverage()
+        coverage.timestamps = time_axis(raw["domain"]["axes"]["t"])
+        for name, rng in raw.get("ranges", {}).items():
+            arrow_type = ARROW_TYPES.get(rng.get("dataType"), pa.float64())
+            missing = (missing_values or {}).get(name)
+            coverage.ranges[name] = _range_array(rng["values"], arrow_type, missing)
+        tables.append(_coverage_table(coverage, station_id))
+    return _combine(tables)
+
+def coverage_to_polars(data: Dict[str, Any], station_id: Optional[str] = None, missing_values: Optional[Dict[str, Iterable[Any]]] = None):
+    """
+    `coverage_to_table` as a Polars DataFrame (zero-copy from Arrow).
+    """
+    import polars as pl
+    return pl.from_arrow(coverage_to_table(data, station_id, missing_values))
+
+def _combine(tables: List[pa.Table]) -> pa.Table:
+    tables = [t for t in tables if t.num_rows]
+    if not tables:
+        return pa.table({"timestamp": pa.array([], TIMESTAMP_TYPE), "station": pa.array([], pa.string())})
+    return pa.concat_tables(tables, promote_options="default")
+
+def _coverage_table(coverage: _Coverage, station_id: Optional[str]) -> pa.Table:
+    n = len(coverage.timestamps)
+    columns: Dict[str, Any] = {
+        "timestamp": coverage.timestamps,
+        "station": pa.repeat(pa.scalar(station_id, pa.string()), n),
+    }
+    for name in sorted(coverage.ranges):
+        values = coverage.ranges[name]
+        if len(values) != n:
+            raise ValueError(f"Range '{name}' has {len(values)} values for {n} timestamps")
+        columns[name] = values
+    return pa.table(columns)
+
+def split_table_by_month(table: pa.Table) -> Dict[datetime, pa.Table]:
+    """
+    Slice a decoded table into calendar months (keyed by month start, UTC),
+    the table-side twin of `split_coverage_by_month`.
+    """
+    if table.num_rows == 0:
+        return {}
+    timestamps = table["timestamp"]
+    month_index = pc.add(pc.multiply(pc.year(timestamps), 12), pc.subtract(pc.month(timestamps), 1))
+    slices = {}
+    for index in pc.unique(month_index).to_pylist():
+        month = datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+        slices[month] = table.filter(pc.equal(month_index, index))
+    return slices
+
+def split_coverage_by_month(data: Dict[str, Any]) -> Dict[datetime, Dict[str, Any]]:
+    """
+    Slice a CoverageJSON document along its time axis into one document per
+    calendar month (keyed by month start, UTC). Each slice holds exactly the
+    timestamps in [month start, next month start).
+    """
+    coverages = data.get("coverages", [data] if "domain" in data else [])
+    slices: Dict[datetime, Dict[str, Any]] = {}
+
+    for c_idx, coverage in enumerate(coverages):
+        t_values = coverage["domain"]["axes"]["t"]["values"]
+
+        # Contiguous index ranges per month (the time axis is sorted)
+        bounds: Dict[datetime, List[int]] = {}
+        for i, t in enumerate(t_values):
+            ts = parse_time(t).astimezone(timezone.utc)
+            key = datetime(ts.year, ts.month, 1, tzinfo=timezone.utc)
+            bounds.setdefault(key, [i, i])[1] = i
+
+        for month, (lo, hi) in bounds.items():
+            doc = slices.get(month)
+            if doc is None:
+                doc = {k: v for k, v in data.items() if k != "coverages"}
+                doc["coverages"] = [None] * len(coverages)
+                slices[month] = doc
+            doc["coverages"][c_idx] = _slice_coverage(coverage, lo, hi + 1)
+
+    # Drop coverages that had no timestamps in a given month
+    for doc in slices.values():
+        doc["coverages"] = [c for c in doc["coverages"] if c is not None]
+    return slices
+
+def _slice_coverage(coverage: Dict[str, Any], lo: int, hi: int) -> Dict[str, Any]:
+    axes = dict(coverage["domain"]["axes"])
+    axes["t"] = {**axes["t"], "values": axes["t"]["values"][lo:hi]}
+    ranges = {}
+    for name, rng in coverage.get("ranges", {}).items():
+        axis_names = rng.get("axisNames", ["t"])
+        shape = list(rng.get("shape", [len(rng["values"])]))
+        t_idx = axis_names.index("t")
+        if any(size != 1 for i, size in enumerate(shape) if i != t_idx):
+            raise ValueError(f"Cannot slice range '{name}': only point series are supported")
+        shape[t_idx] = hi - lo
+        ranges[name] = {**rng, "shape": shape, "values": rng["values"][lo:hi]}
+    return {
+        **coverage,
+        "domain": {**coverage["domain"], "axes": axes},
+        "ranges": ranges,
+    }
+
+def append_coverage(base: Dict[str, Any], new: Dict[str, Any], after: datetime, before: datetime) -> Tuple[Dict[str, Any], int]:
+    """
+    Append the timestamps of `new` in (after, before) to the matching
+    coverages of `base` (a landing document). Parameters missing on either
+    side are padded with nulls. Returns (merged document, rows appended).
+    """
+    merged = {**base, "coverages": list(base.get("coverages", []))}
+    appended = 0
+    for c_idx, coverage in enumerate(new.get("coverages", [])):
+        t_values = coverage["domain"]["axes"]["t"]["values"]
+        keep = [i for i, t in enumerate(t_values) if after < parse_time(t) < before]
+        if not keep:
+            continue
+        tail = _slice_coverage(coverage, keep[0], keep[-1] + 1)
+        appended += len(keep)
+        if c_idx >= len(merged["coverages"]):
+            merged["coverages"].append(tail)
+            continue
+
+        head = merged["coverages"][c_idx]
+        n_head = len(head["domain"]["axes"]["t"]["values"])
+        axes = dict(head["domain"]["axes"])
+        axes["t"] = {**axes["t"], "values": axes["t"]["values"] + tail["domain"]["axes"]["t"]["values"]}
+        ranges = {}
+        for name in {**head.get("ranges", {}), **tail.get("ranges", {})}:
+            old = head.get("ranges", {}).get(name)
+            add = tail.get("ranges", {}).get(name)
+            template = old or add
+            values = (old["values"] if old else [None] * n_head) + (add["values"] if add else [None] * len(keep))
+            shape = list(template.get("shape", [len(values)]))
+            shape[template.get("axisNames", ["t"]).index("t")] = len(values)
+            ranges[name] = {**template, "shape": shape, "values": values}
+        merged["coverages"][c_idx] = {**head, "domain": {**head["domain"], "axes": axes}, "ranges": ranges}
+    return merged, appended
@@ -0,0 +1,82 @@
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from src.utils.window_planner import add_months
+
+if TYPE_CHECKING:
+    import fsspec
+    import pyarrow as pa
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# (station_id, month start) identifies one landing partition
+PartitionRef = Tuple[str, datetime]
+
+def json_digest(doc: Any) -> str:
+    """
+    sha256 of a document's canonical JSON encoding, computed incrementally.
+    """
+    digest = hashlib.sha256()
+    for piece in json.JSONEncoder(sort_keys=True).iterencode(doc):
+        digest.update(piece.encode("utf-8"))
+    return digest.hexdigest()
+
+def table_digest(table: "pa.Table") -> str:
+    """
+    sha256 of a table's Arrow IPC encoding (schema + values).
+    """
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue()).hexdigest()
+
+class LandingManifest:
+    """
+    One small JSON entry per landing partition under DATA_ROOT/_manifest:
+    what was written (path, sha256, rows), when it was fetched and the
+    response's ETag / Last-Modified.
+
+    Entries are per partition rather than one shared index, so concurrent
+    backfill runs never race on the same object.
+    """
+    def __init__(self, fs: "fsspec.AbstractFileSystem", data_root: str):
+        self.fs = fs
+        self.root = f"{data_root}/_manifest/landing/source=knmi/type=hourly"
+
+    def entry_path(self, station_id: str, month: datetime) -> str:
+        return f"{self.root}/station={station_id}/year={month.year}/month={month.month:02d}.json"
+
+    def load(self, refs: Iterable[PartitionRef]) -> Dict[PartitionRef, Dict[str, Any]]:
+        """
+        Fetch the entries for many partitions in one batched call.
+        Partitions without an entry are simply absent from the result.
+        """
+        # fsspec keys the result by path without protocol
+        paths = {self.fs._strip_protocol(self.entry_path(*ref)): ref for ref in refs}
+        if not paths:
+            return {}
+        found = self.fs.cat(list(paths), on_error="omit")
+        return {paths[path]: json.loads(body) for path, body in found.items() if path in paths}
+
+    def save(self, station_id: str, month: datetime, entry: Dict[str, Any]) -> None:
+        with self.fs.open(self.entry_path(station_id, month), "w") as f:
+            json.dump(entry, f, sort_keys=True)
+
+def is_settled(entry: Optional[Dict[str, Any]], month: datetime, settled_days: Optional[int]) -> bool:
+    """
+    True if the partition was last fetched `settled_days` after its month
+    ended, i.e. after KNMI finished validating it, so it will not change.
+    """
+    if not entry or settled_days is None:
+        return False
+    fetched_at = datetime.fromisoformat(entry["fetched_at"])
+    return fetched_at >= add_months(month, 1) + timedelta(days=settled_days)
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,148 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Where ingestion time goes, in request order
+PHASES = ("rate_limit_wait", "dns", "connect", "ttfb", "download", "decode", "upload", "manifest")
+
+class Metrics:
+    """
+    Thread-safe accumulator of phase timings (seconds) and counters
+    (requests, retries, http_429, not_modified, bytes_downloaded, ...).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[phase] += seconds
+
+    def incr(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += n
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - started)
+
+    def merge(self, other: "Metrics") -> None:
+        with other._lock:
+            seconds, counters = dict(other.seconds), dict(other.counters)
+        with self._lock:
+            for phase, value in seconds.items():
+                self.seconds[phase] += value
+            for counter, value in counters.items():
+                self.counters[counter] += value
+
+    def as_metadata(self) -> Dict[str, float]:
+        """
+        Flat numeric metadata (Dagster plots these per partition over time).
+        """
+        with self._lock:
+            metadata = {f"time_{phase}_s": round(self.seconds[phase], 4) for phase in PHASES if phase in self.seconds}
+            metadata.update(self.counters)
+        return metadata
+
+    def to_prometheus(self, prefix: str = "knmi_ingest", extra: Optional[Dict[str, float]] = None) -> str:
+        """
+        Prometheus / OpenMetrics text exposition of the values as gauges
+        (one batch run = one sample, the textfile-collector convention).
+        """
+        with self._lock:
+            seconds, counters = dict(self.seconds), dict(self.counters)
+        lines = [
+            f"# HELP {prefix}_phase_seconds Seconds spent per phase in the last run",
+            f"# TYPE {prefix}_phase_seconds gauge",
+        ]
+        lines += [f'{prefix}_phase_seconds{{phase="{phase}"}} {value:.6f}' for phase, value in sorted(seconds.items())]
+        lines += [
+            f"# HELP {prefix}_events Events counted in the last run",
+            f"# TYPE {prefix}_events gauge",
+        ]
+        lines += [f'{prefix}_events{{event="{name}"}} {value}' for name, value in sorted(counters.items())]
+        for name, value in (extra or {}).items():
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+def trace_config() -> "aiohttp.TraceConfig":
+    """
+    aiohttp hooks splitting each request into DNS, connect and TTFB.
+    Pass the request's `Metrics` as `trace_request_ctx`.
+    """
+    import aiohttp
+
+    config = aiohttp.TraceConfig()
+
+    async def _on_request_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+        ctx.connecting = 0.0
+
+    async def _on_dns_start(session, ctx, params):
+        ctx.dns_started = time.perf_counter()
+
+    async def _on_dns_end(session, ctx, params):
+        if isinstance(ctx.trace_request_ctx, Metrics):
+            ctx.trace_request_ctx.add_time("dns", time.perf_counter() - ctx.dns_started)
+
+    async def _on_connect_start(session, ctx, params):
+        ctx.connect_started = time.perf_counter()
+
+    async def _on_connect_end(session, ctx, params):
+        # Includes DNS when the host was not cached; reported separately above
+        ctx.connecting = time.perf_counter() - ctx.connect_started
+        if isinstance(ctx.trace_request_ctx, Metrics):
+            ctx.trace_request_ctx.add_time("connect", ctx.connecting)
+
+    async def _on_request_end(session, ctx, params):
+        # Fired once the response headers are in
+        if isinstance(ctx.trace_request_ctx, Metrics):
+            ctx.trace_request_ctx.add_time("ttfb", time.perf_counter() - ctx.started - ctx.connecting)
+
+    config.on_request_start.append(_on_request_start)
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connect_start)
+    config.on_connection_create_end.append(_on_connect_end)
+    config.on_request_end.append(_on_request_end)
+    return config
+
+def export_metrics(metrics: Metrics, textfile: Optional[str], pushgateway_url: Optional[str], job: str, extra: Optional[Dict[str, float]] = None) -> None:
+    """
+    Write the run's metrics to a Prometheus textfile (node_exporter
+    textfile collector) and/or push them to a Pushgateway. Export problems
+    are logged, never raised: metrics must not fail an ingestion run.
+    """
+    if not textfile and not pushgateway_url:
+        return
+    body = metrics.to_prometheus(extra={"last_run_timestamp_seconds": round(time.time(), 3), **(extra or {})})
+    if textfile:
+        try:
+            # Write-then-rename so the collector never reads a partial file
+            tmp = f"{textfile}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(body)
+            os.replace(tmp, textfile)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {textfile}: {e}")
+    if pushgateway_url:
+        import requests
+        try:
+            requests.put(f"{pushgateway_url.rstrip('/')}/metrics/job/{job}", data=body.encode("utf-8"), timeout=10).raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Could not push metrics to {pushgateway_url}: {e}")
@@ -0,0 +1,176 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import functools
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Header names used by the KNMI gateway and the IETF RateLimit draft
+_REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+_RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    blocked_until REAL NOT NULL DEFAULT 0,
+    strikes INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+def default_db_path() -> str:
+    """
+    Default location of the shared bucket state (KNMI_RATE_LIMIT_DB
+    overrides it): $DAGSTER_HOME, else the temp dir. Every process calling
+    the API must see the same file; docker-compose points both containers
+    at the shared dagster_home volume.
+    """
+    root = os.environ.get("DAGSTER_HOME") or tempfile.gettempdir()
+    return os.path.join(root, "knmi_rate_limit.sqlite")
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _header(headers: Mapping[str, str], names: tuple) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+class TokenBucket:
+    """
+    Token bucket keyed by API token and shared across processes through SQLite.
+
+    Each acquire runs in a `BEGIN IMMEDIATE` transaction, so parallel Dagster
+    runs on the same node draw from one budget instead of each assuming
+    they own the whole quota.
+    """
+    def __init__(self, key: str, rate: float, capacity: float, db_path: Optional[str] = None):
+        self.key = key
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.db_path = db_path or default_db_path()
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps this safe to use from threads
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _transact(self, fn):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated, blocked_until, strikes FROM buckets WHERE key = ?",
+                (self.key,),
+            ).fetchone()
+            now = time.time()
+            if row is None:
+                tokens, blocked_until, strikes = self.capacity, 0.0, 0
+            else:
+                tokens, updated, blocked_until, strikes = row
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+            result, tokens, blocked_until, strikes = fn(now, tokens, blocked_until, strikes)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated, blocked_until, strikes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.key, tokens, now, blocked_until, strikes),
+            )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available. Returns 0.0 on success, otherwise the number
+        of seconds to wait before trying again.
+        """
+        def _take(now, available, blocked_until, strikes):
+            if now < blocked_until:
+                return blocked_until - now, available, blocked_until, strikes
+            if available >= tokens:
+                return 0.0, available - tokens, blocked_until, strikes
+            return (tokens - available) / self.rate, available, blocked_until, strikes
+        return self._transact(_take)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until tokens are available. Returns the total time spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, retry_after: Optional[float] = None) -> float:
+        """
+        Register a 429. Uses the server's Retry-After when given, otherwise an
+        exponential backoff that grows with consecutive 429s. Returns the delay.
+        """
+        def _strike(now, available, blocked_until, strikes):
+            delay = retry_after if retry_after is not None else min(60.0, 2.0 ** strikes)
+            return delay, 0.0, max(blocked_until, now + delay), strikes + 1
+        return self._transact(_strike)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """
+        Adapt to rate-limit headers on a successful response: an exhausted
+        quota blocks the bucket until the reported reset, and any success
+        clears the 429 strike counter.
+        """
+        remaining = _header(headers, _REMAINING_HEADERS)
+        reset = _header(headers, _RESET_HEADERS)
+
+        def _observe(now, available, blocked_until, strikes):
+            if remaining is not None and remaining <= 0 and reset:
+                # Reset is either seconds-from-now or an absolute epoch timestamp
+                until = reset if reset > now else now + reset
+                blocked_until = max(blocked_until, until)
+                available = 0.0
+            return None, available, blocked_until, 0
+        self._transact(_observe)
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limiter(api_token: str, rate: float, capacity: float, db_path: Optional[str] = None) -> TokenBucket:
+    """
+    Return the process-wide bucket for an API token.
+    The token is hashed so the secret never lands in the state file.
+    """
+    key = hashlib.sha256(api_token.encode("utf-8")).hexdigest()[:16]
+    return TokenBucket(key, rate, capacity, db_path)
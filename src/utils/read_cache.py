@@ -0,0 +1,193 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+
+import fsspec
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Manifests are rewritten in place; always read them from the remote
+_UNCACHED_RE = re.compile(r"(^|/)_manifest")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched REAL NOT NULL,
+    accessed REAL NOT NULL,
+    version TEXT
+)
+"""
+
+def object_version(info: dict) -> str:
+    """
+    Identity of a remote object's content from `fs.info`: the ETag where the
+    store has one (S3, GCS), else size and modification time.
+    """
+    etag = info.get("ETag") or info.get("etag")
+    if etag:
+        return str(etag)
+    mtime = info.get("mtime") or info.get("LastModified") or info.get("updated")
+    return f"{info.get('size')}:{mtime}"
+
+class ReadCacheFileSystem:
+    """
+    Read-through local disk cache in front of an fsspec filesystem.
+
+    `open(path, "rb"/"r")` serves a local copy of the whole object, downloaded
+    on first use. After `ttl_seconds` the copy is checked against the
+    remote object's version (ETag, or size and mtime) and only downloaded
+    again if it changed, so files rewritten in place (bronze/silver/gold,
+    force-refetched landing) are picked up while settled months cost one
+    metadata request. Manifests are never cached.
+    When the cache grows past `max_bytes` the least recently read files are
+    evicted. Writes and deletes go straight to the remote and drop the local
+    copy; every other attribute is delegated unchanged.
+
+    Bookkeeping lives in SQLite next to the files, so parallel run processes
+    on a node share one cache.
+    """
+    def __init__(
+        self,
+        fs: fsspec.AbstractFileSystem,
+        cache_dir: str,
+        max_bytes: int,
+        ttl_seconds: float,
+    ):
+        self.fs = fs
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.local = fsspec.filesystem("file")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "cache.sqlite")
+        conn = self._connect()
+        try:
+            conn.execute(_SCHEMA)
+            if "version" not in {row[1] for row in conn.execute("PRAGMA table_info(entries)")}:
+                # Caches created before entries were versioned: all of them get refetched
+                conn.execute("ALTER TABLE entries ADD COLUMN version TEXT")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _key(self, path: str) -> str:
+        return hashlib.sha256(self.fs.unstrip_protocol(self.fs._strip_protocol(path)).encode("utf-8")).hexdigest()
+
+    def _local_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def __getattr__(self, name):
+        return getattr(self.fs, name)
+
+    def open(self, path: str, mode: str = "rb", **kwargs):
+        if "r" not in mode:
+            self.invalidate(path)
+            return self.fs.open(path, mode, **kwargs)
+        if _UNCACHED_RE.search(path):
+            return self.fs.open(path, mode, **kwargs)
+        local = self._ensure_local(path)
+        # Compression etc. are applied to the local copy exactly as remotely
+        return self.local.open(local, mode, **kwargs)
+
+    def rm(self, path, *args, **kwargs):
+        for p in [path] if isinstance(path, str) else path:
+            self.invalidate(p)
+        return self.fs.rm(path, *args, **kwargs)
+
+    def invalidate(self, path: str) -> None:
+        key = self._key(path)
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        finally:
+            conn.close()
+        try:
+            os.remove(self._local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _ensure_local(self, path: str) -> str:
+        key = self._key(path)
+        local = self._local_path(key)
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT fetched, version FROM entries WHERE key = ?", (key,)).fetchone()
+            cached = row is not None and os.path.exists(local)
+            if cached and now - row[0] < self.ttl_seconds:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                return local
+        finally:
+            conn.close()
+
+        # Miss or expired: the version is read before the download, so a
+        # concurrent rewrite leaves a mismatch and is refetched next time
+        version = object_version(self.fs.info(path))
+        if cached and version == row[1]:
+            conn = self._connect()
+            try:
+                conn.execute("UPDATE entries SET fetched = ?, accessed = ? WHERE key = ?", (now, now, key))
+            finally:
+                conn.close()
+            return local
+
+        # Download to a temp file, then swap in atomically
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        tmp = f"{local}.{os.getpid()}.tmp"
+        self.fs.get_file(path, tmp)
+        os.replace(tmp, local)
+        size = os.path.getsize(local)
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, path, size, fetched, accessed, version) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, path, size, now, now, version),
+            )
+        finally:
+            conn.close()
+        self._evict(keep=key)
+        return local
+
+    def _evict(self, keep: str) -> None:
+        """
+        Drop least recently read files until the cache fits in max_bytes.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            evicted = []
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    if key == keep:
+                        continue
+                    evicted.append(key)
+                    total -= size
+                conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in evicted])
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        for key in evicted:
+            try:
+                os.remove(self._local_path(key))
+            except FileNotFoundError:
+                pass
+        if evicted:
+            logger.info(f"Read cache evicted {len(evicted)} file(s)")
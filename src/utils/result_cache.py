@@ -0,0 +1,72 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    Thread-safe in-process cache of query results, keyed by the caller.
+
+    An entry is served while it is younger than `ttl_seconds` and was computed
+    against the same `version` (e.g. the latest materialization of the assets
+    it reads), so a new materialization invalidates it immediately instead of
+    after the TTL. At most `max_entries` are kept, least recently used first out.
+
+    Values are returned as stored, not copied: Arrow tables and Polars frames
+    are immutable, so every session can share them.
+    """
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Any = None) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, stored_at, value = entry
+                if entry_version == version and now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any, version: Any = None) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], version: Any = None) -> Any:
+        """
+        Cached value for `key`, or `compute()` stored under it. Concurrent
+        misses may compute twice; the result is the same, so no lock is held
+        around the query itself.
+        """
+        found, value = self.get(key, version)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value, version)
+        return value
+
+    def invalidate(self, match: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop all entries, or those whose key satisfies `match`.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if match is None or match(key)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
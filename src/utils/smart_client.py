@@ -1,15 +1,55 @@
+import os
+import json
 import time
+import queue
+import asyncio
 import logging
-import requests
-import fsspec
-from typing import Any, Dict, Optional
+import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Literal, Optional, Tuple
 from pydantic import Field
 from pydantic_settings import BaseSettings
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, retry, stop_after_attempt, wait_exponential
+
+from src.utils.metrics import Metrics, trace_config
+from src.utils.storage import Compression, copy_stream
+from src.utils.rate_limiter import get_rate_limiter, parse_retry_after
+from src.utils.window_planner import get_window_planner, parse_time
+
+# The code location imports this module, so the HTTP, storage and Arrow
+# stacks are only imported once a client actually needs them
+if TYPE_CHECKING:
+    import aiohttp
+    import fsspec
+    import pyarrow as pa
+    import requests
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Hourly validated observations: used for both station discovery and data
+COLLECTION = "hourly-in-situ-meteorological-observations-validated"
+
+# Shared by the sync fetch methods and the async bulk path
+RETRY_POLICY = dict(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
+
+# A (station_id, start, end) request window, times as ISO8601 strings
+Window = Tuple[str, str, str]
+
+# Yielded by fetch_many instead of data when a conditional request got a 304
+NOT_MODIFIED = object()
+
+# Response headers kept so a window can be re-requested conditionally
+VALIDATOR_HEADERS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+# Streaming decodes: chunk size (ijson's read size) and chunks buffered
+# between the download and the decoder thread
+STREAM_CHUNK_BYTES = 64 * 1024
+STREAM_BUFFER_CHUNKS = 16
+# Bodies kept for the landing JSON copy spill to disk beyond this size
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
 class KnmiSettings(BaseSettings):
     """
     Configuration settings loaded from environment variables.
@@ -23,21 +63,263 @@ class KnmiSettings(BaseSettings):
     AWS_ACCESS_KEY_ID: Optional[str] = None
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
 
+    # S3 multipart upload tuning (s3fs defaults)
+    S3_BLOCK_SIZE_MB: int = Field(50, description="Multipart part size; smaller objects go up in a single PUT")
+    S3_MAX_CONCURRENCY: int = Field(10, description="Parts uploaded in parallel per object")
+
+    # HTTP Connection Pool (shared by all clients in a process)
+    HTTP_POOL_CONNECTIONS: int = Field(4, description="Number of per-host connection pools to keep")
+    HTTP_POOL_MAXSIZE: int = Field(16, description="Max keep-alive connections per host")
+    HTTP_TIMEOUT: float = Field(120.0, description="Connect/read timeout in seconds for API calls")
+
+    # Rate Limiting (token bucket shared by all processes using the same token)
+    KNMI_RATE_LIMIT_PER_SECOND: float = Field(1.0, description="Sustained requests per second allowed by the KNMI quota")
+    KNMI_RATE_LIMIT_BURST: float = Field(5.0, description="Max requests that may be issued back-to-back")
+    KNMI_RATE_LIMIT_DB: Optional[str] = Field(None, description="SQLite file coordinating the bucket (defaults to $DAGSTER_HOME)")
+    KNMI_RATE_LIMIT_MAX_429: int = Field(10, description="429 responses tolerated per call before giving up")
+
+    # Landing Zone
+    KNMI_LANDING_FORMAT: Literal["json", "parquet"] = Field("json", description="File format written by knmi_hourly_observations")
+    KNMI_LANDING_KEEP_JSON: bool = Field(False, description="With parquet landing, also keep the compressed CoverageJSON")
+    KNMI_LANDING_COMPRESSION: Compression = Field("none", description="Codec for raw JSON writes: none, gzip or zstd")
+    KNMI_LANDING_SKIP_UNCHANGED: bool = Field(True, description="Skip fetches/uploads of landing partitions the manifest shows unchanged")
+    KNMI_LANDING_SETTLED_DAYS: Optional[int] = Field(30, description="Days after month end when validated data is final and never refetched (unset = always revalidate)")
+
+    # Stations Sensor
+    KNMI_RETIRE_STATIONS: bool = Field(False, description="Let the stations sensor delete partitions of stations that vanished from the list")
+
+    # Read Cache (local disk copy of files read from DATA_ROOT)
+    KNMI_CACHE_DIR: Optional[str] = Field(None, description="Local directory for the read-through file cache (unset = disabled)")
+    KNMI_CACHE_MAX_GB: float = Field(20.0, description="Size above which least recently read cached files are evicted")
+    KNMI_CACHE_TTL_SECONDS: float = Field(900.0, description="Age after which cached files are checked against the remote (ETag or size/mtime)")
+
+    # Dashboard
+    KNMI_DASHBOARD_CACHE_TTL_SECONDS: float = Field(3600.0, description="Max age of cached dashboard query results")
+    KNMI_DASHBOARD_CACHE_ENTRIES: int = Field(512, description="Query results kept by the dashboard (LRU)")
+
+    # Bulk (async) fetching
+    KNMI_MAX_CONCURRENCY: int = Field(8, description="Max in-flight requests for fetch_many")
+
+    # Instrumentation export (per-partition timings are always in the asset metadata)
+    KNMI_METRICS_TEXTFILE: Optional[str] = Field(None, description="Prometheus textfile the ingestion assets write their run metrics to")
+    KNMI_METRICS_PUSHGATEWAY_URL: Optional[str] = Field(None, description="Prometheus Pushgateway the run metrics are pushed to")
+
+    # Adaptive request windows (months per data call)
+    KNMI_WINDOW_START_MONTHS: int = Field(3, description="Initial months per data call")
+    KNMI_WINDOW_MAX_MONTHS: int = Field(12, description="Upper bound on months per data call")
+    KNMI_WINDOW_MAX_MB: float = Field(64.0, description="Response size above which windows shrink")
+    KNMI_WINDOW_MAX_SECONDS: float = Field(60.0, description="Response time above which windows shrink")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         extra = "ignore"
+        # Shared by every client in the process (see get_settings)
+        frozen = True
+
+@functools.lru_cache(maxsize=8)
+def _load_settings(cwd: str, environ: Tuple[Tuple[str, str], ...]) -> KnmiSettings:
+    return KnmiSettings()
+
+def get_settings() -> KnmiSettings:
+    """
+    Return the process-wide settings. They are parsed (environment and .env)
+    once, and again only if a KNMI setting in the environment or the working
+    directory changed since.
+    """
+    fields = {name.upper() for name in KnmiSettings.model_fields}
+    environ = tuple(sorted((k, v) for k, v in os.environ.items() if k.upper() in fields))
+    return _load_settings(os.getcwd(), environ)
+
+@functools.lru_cache(maxsize=None)
+def _build_filesystem(
+    pid: int,
+    protocol: str,
+    storage_options: Tuple[Tuple[str, Any], ...],
+    cache_dir: Optional[str],
+    cache_max_bytes: int,
+    cache_ttl_seconds: float,
+) -> "fsspec.AbstractFileSystem":
+    """
+    Build the DATA_ROOT filesystem, wrapped in the read cache if configured.
+    Cached per process id like the HTTP session.
+    """
+    import fsspec
+
+    fs = fsspec.filesystem(protocol, **dict(storage_options))
+    if cache_dir:
+        from src.utils.read_cache import ReadCacheFileSystem
+
+        # Reads are served from local disk; writes still go to DATA_ROOT
+        fs = ReadCacheFileSystem(fs, cache_dir, max_bytes=cache_max_bytes, ttl_seconds=cache_ttl_seconds)
+    return fs
+
+@functools.lru_cache(maxsize=None)
+def _build_session(pid: int, pool_connections: int, pool_maxsize: int) -> "requests.Session":
+    """
+    Build a keep-alive session with a connection pool.
+    Cached per process id so a forked worker never reuses its parent's sockets.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import make_headers
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Only advertise encodings urllib3 can actually decode (br/zstd if the extras are installed)
+    session.headers.update({
+        "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+        "Connection": "keep-alive",
+    })
+    logger.debug(f"Created pooled HTTP session (pid={pid}, pools={pool_connections}, maxsize={pool_maxsize})")
+    return session
+
+def get_http_session(pool_connections: int = 4, pool_maxsize: int = 16) -> "requests.Session":
+    """
+    Return the process-wide pooled HTTP session.
+    Every KnmiClient in the same worker process shares it, so TCP/TLS handshakes
+    are paid once per process instead of once per partition.
+    """
+    return _build_session(os.getpid(), pool_connections, pool_maxsize)
+
+class _CountingReader:
+    """
+    File-like wrapper that counts the bytes handed to a streaming parser.
+    """
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+class _StreamReader:
+    """
+    File-like view of a response body for a decoder running in a worker
+    thread while the event loop is still downloading it. At most
+    STREAM_BUFFER_CHUNKS chunks are buffered, so memory stays bounded
+    whatever the body size. Bytes read are also written to `copy`, if set.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._chunks: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._space = asyncio.Semaphore(STREAM_BUFFER_CHUNKS)
+        self._buffer = b""
+        self._eof = False
+        self._stopped = False
+        self.copy = None
+
+    async def feed(self, chunk: bytes) -> bool:
+        """
+        Event loop side: hand over one chunk, waiting while the buffer is
+        full. False once the decoder stopped reading.
+        """
+        await self._space.acquire()
+        if self._stopped:
+            return False
+        self._chunks.put(chunk)
+        return True
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """
+        Event loop side: the body is complete, or the download failed.
+        """
+        self._chunks.put(error or b"")
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or not self._buffer):
+            chunk = self._chunks.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if not chunk:
+                self._eof = True
+                break
+            self._loop.call_soon_threadsafe(self._space.release)
+            self._buffer += chunk
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        if self.copy is not None:
+            self.copy.write(data)
+        return data
+
+    def stop(self) -> None:
+        """
+        Decoder side, when it returns or fails: release a feeder waiting for space.
+        """
+        self._stopped = True
+        self._loop.call_soon_threadsafe(self._space.release)
+
+def _decode_table(reader: _StreamReader, station_id: str) -> "pa.Table":
+    from src.utils.coverage import stream_coverage_table
+
+    return stream_coverage_table(reader, station_id)
+
+def _decode_table_json(reader: _StreamReader, station_id: str) -> Tuple["pa.Table", Dict[str, Any]]:
+    """
+    Table plus the parsed document (landing that keeps the JSON). The body
+    is spooled while the table is decoded, then parsed incrementally from
+    the spool: the raw text is never held in memory next to the document.
+    """
+    import ijson
+    from src.utils.coverage import stream_coverage_table
+
+    with tempfile.SpooledTemporaryFile(SPOOL_MAX_BYTES) as spool:
+        reader.copy = spool
+        table = stream_coverage_table(reader, station_id)
+        # Whatever the parser left unread
+        while reader.read(STREAM_CHUNK_BYTES):
+            pass
+        spool.seek(0)
+        document = next(ijson.items(spool, "", use_float=True))
+    return table, document
+
+# decode modes of fetch_many that consume the body while it downloads
+STREAM_DECODERS = {"table": _decode_table, "table_json": _decode_table_json}
 
 class KnmiClient:
     """
     Smart Client for KNMI API interaction and FileSystem abstraction.
+
+    Construction is cheap: settings are shared per process, and the
+    filesystem and HTTP session are built (once per process) on first use.
+    Pass `settings` to override the environment (see `KnmiClientResource`).
     """
-    def __init__(self):
-        self.settings = KnmiSettings()
-        self.fs = self._init_filesystem()
+    def __init__(self, settings: Optional[KnmiSettings] = None):
+        self.settings = settings or get_settings()
         self.headers = {"Authorization": self.settings.KNMI_API_TOKEN}
+        self.rate_limiter = get_rate_limiter(
+            self.settings.KNMI_API_TOKEN,
+            self.settings.KNMI_RATE_LIMIT_PER_SECOND,
+            self.settings.KNMI_RATE_LIMIT_BURST,
+            self.settings.KNMI_RATE_LIMIT_DB,
+        )
+        self.planner = get_window_planner(
+            self.settings.KNMI_WINDOW_START_MONTHS,
+            self.settings.KNMI_WINDOW_MAX_MONTHS,
+            int(self.settings.KNMI_WINDOW_MAX_MB * 1024 * 1024),
+            self.settings.KNMI_WINDOW_MAX_SECONDS,
+        )
+        # ETag / Last-Modified of the latest response per fetched window
+        self.validators: Dict[Window, Dict[str, str]] = {}
+        # Phase timings and counters: run total, and per fetch_many window
+        self.metrics = Metrics()
+        self.window_metrics: Dict[Window, Metrics] = {}
+
+    @property
+    def session(self) -> "requests.Session":
+        return get_http_session(self.settings.HTTP_POOL_CONNECTIONS, self.settings.HTTP_POOL_MAXSIZE)
 
-    def _init_filesystem(self) -> fsspec.AbstractFileSystem:
+    @property
+    def fs(self) -> "fsspec.AbstractFileSystem":
+        return self._init_filesystem()
+
+    def _init_filesystem(self) -> "fsspec.AbstractFileSystem":
         """
         Initialize the filesystem based on DATA_ROOT scheme.
         """
@@ -49,54 +331,321 @@ class KnmiClient:
                 "key": self.settings.AWS_ACCESS_KEY_ID,
                 "secret": self.settings.AWS_SECRET_ACCESS_KEY,
                 "endpoint_url": self.settings.ENDPOINT_URL,
+                "default_block_size": self.settings.S3_BLOCK_SIZE_MB * 1024 * 1024,
+                "max_concurrency": self.settings.S3_MAX_CONCURRENCY,
             }
         elif protocol == "gs":
             # GCS specific options if needed
             pass
+        elif protocol == "file":
+            # Local lakes (development, benchmarks) need the hive directories created
+            storage_options = {"auto_mkdir": True}
             
-        return fsspec.filesystem(protocol, **storage_options)
+        return _build_filesystem(
+            os.getpid(),
+            protocol,
+            tuple(sorted(storage_options.items())),
+            self.settings.KNMI_CACHE_DIR,
+            int(self.settings.KNMI_CACHE_MAX_GB * 1024 ** 3),
+            self.settings.KNMI_CACHE_TTL_SECONDS,
+        )
 
-    def get_filesystem(self) -> fsspec.AbstractFileSystem:
+    def get_filesystem(self) -> "fsspec.AbstractFileSystem":
         return self.fs
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
+    def _get(self, url: str, params: Dict[str, Any], stream: bool = False) -> "requests.Response":
+        """
+        Rate-limited GET. 429s are absorbed here (the bucket is blocked for
+        Retry-After and the request re-issued) so they don't consume the
+        tenacity attempts reserved for real failures.
+        """
+        for _ in range(self.settings.KNMI_RATE_LIMIT_MAX_429 + 1):
+            self.metrics.add_time("rate_limit_wait", self.rate_limiter.acquire())
+            started = time.perf_counter()
+            response = self.session.get(
+                url, headers=self.headers, params=params, timeout=self.settings.HTTP_TIMEOUT, stream=stream
+            )
+            # requests only exposes time-to-headers (connect included); a
+            # non-streamed body has already been read on return
+            ttfb = response.elapsed.total_seconds()
+            self.metrics.add_time("ttfb", ttfb)
+            self.metrics.incr("requests")
+            if response.status_code != 429:
+                self.rate_limiter.observe(response.headers)
+                if not stream:
+                    self.metrics.add_time("download", max(time.perf_counter() - started - ttfb, 0.0))
+                    self.metrics.incr("bytes_downloaded", len(response.content))
+                break
+            self.metrics.incr("http_429")
+            response.close()
+            delay = self.rate_limiter.penalize(parse_retry_after(response.headers.get("Retry-After")))
+            logger.warning(f"Rate limited by KNMI (429), backing off {delay:.1f}s")
+        response.raise_for_status()
+        return response
+
+    @retry(**RETRY_POLICY)
     def fetch_locations(self) -> Dict[str, Any]:
         """
         Fetch station metadata from KNMI EDR API.
         Hits /collections/hourly-in-situ-meteorological-observations-validated/locations
         """
         # We use the hourly validated collection for station discovery
-        collection = "hourly-in-situ-meteorological-observations-validated"
-        url = f"{self.settings.KNMI_API_BASE_URL}/collections/{collection}/locations"
+        url = f"{self.settings.KNMI_API_BASE_URL}/collections/{COLLECTION}/locations"
         params = {"f": "json"}
         
         logger.info(f"Fetching locations from {url}")
-        # Throttle as per requirements
-        time.sleep(1.0)
-        
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
+        response = self._get(url, params)
         return response.json()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
-    def fetch_data(self, station_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    def download_locations(self, writer) -> None:
         """
-        Fetch observation data for a specific station and time range.
+        Stream the station metadata response body straight into `writer`
+        (e.g. a compressed `LandingWriter`) without decoding it.
+        Not retried here: a failure mid-stream leaves part of the body in
+        `writer`, so the caller retries with a fresh one.
+        """
+        url = f"{self.settings.KNMI_API_BASE_URL}/collections/{COLLECTION}/locations"
+        logger.info(f"Downloading locations from {url}")
+        with self._get(url, {"f": "json"}, stream=True) as response:
+            response.raw.decode_content = True
+            copy_stream(response.raw, writer)
+
+    def _data_request(self, station_id: str, start_date: str, end_date: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the URL and query for one station/time-range data call.
         """
-        # Switch to hourly validated data
-        collection = "hourly-in-situ-meteorological-observations-validated"
-        
         # EDR Pattern: /collections/{id}/locations/{locId}
-        url = f"{self.settings.KNMI_API_BASE_URL}/collections/{collection}/locations/{station_id}"
-        
+        url = f"{self.settings.KNMI_API_BASE_URL}/collections/{COLLECTION}/locations/{station_id}"
         params = {
             "f": "CoverageJSON",
             "datetime": f"{start_date}/{end_date}",
         }
+        return url, params
+
+    @retry(**RETRY_POLICY)
+    def fetch_data(self, station_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """
+        Fetch observation data for a specific station and time range.
+        """
+        url, params = self._data_request(station_id, start_date, end_date)
 
         logger.info(f"Fetching data for {station_id} from {start_date} to {end_date}")
-        time.sleep(1.0)
-        
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
+        started = time.perf_counter()
+        response = self._get(url, params)
+        self.planner.observe(parse_time(start_date), parse_time(end_date), len(response.content), time.perf_counter() - started)
         return response.json()
+
+    @retry(**RETRY_POLICY)
+    def fetch_table(self, station_id: str, start_date: str, end_date: str) -> "pa.Table":
+        """
+        Fetch observation data as a columnar table without holding the JSON.
+
+        The response body is decoded incrementally (see
+        `src.utils.coverage.stream_coverage_table`), so peak memory scales with
+        the number of values, not with the size of the CoverageJSON text.
+        """
+        from src.utils.coverage import stream_coverage_table
+
+        url, params = self._data_request(station_id, start_date, end_date)
+
+        logger.info(f"Streaming data for {station_id} from {start_date} to {end_date}")
+        started = time.perf_counter()
+        with self._get(url, params, stream=True) as response:
+            response.raw.decode_content = True
+            body = _CountingReader(response.raw)
+            with self.metrics.timer("decode"):
+                table = stream_coverage_table(body, station_id)
+        self.metrics.incr("bytes_downloaded", body.bytes_read)
+        self.planner.observe(parse_time(start_date), parse_time(end_date), body.bytes_read, time.perf_counter() - started)
+        return table
+
+    async def _aget(
+        self,
+        session: "aiohttp.ClientSession",
+        url: str,
+        params: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        metrics: Optional[Metrics] = None,
+        consume: Optional[Callable[["aiohttp.ClientResponse"], Awaitable[Tuple[Any, int]]]] = None,
+    ) -> Tuple[Any, int, Dict[str, str]]:
+        """
+        Async twin of `_get`: same token bucket, same 429 handling.
+        Returns the (decompressed) response body, or None on a 304, with its
+        size and the response's cache validators. `consume` replaces reading
+        the body: it is handed the response and returns (data, bytes read).
+        Timings and counters go to `metrics` (DNS, connect and TTFB via the
+        session's trace config).
+        """
+        import aiohttp
+
+        metrics = metrics or Metrics()
+        # The token bucket is a SQLite transaction that may wait on other
+        # processes' locks: keep it off the event loop
+        for _ in range(self.settings.KNMI_RATE_LIMIT_MAX_429 + 1):
+            with metrics.timer("rate_limit_wait"):
+                while (wait := await asyncio.to_thread(self.rate_limiter.try_acquire)) > 0:
+                    await asyncio.sleep(wait)
+            metrics.incr("requests")
+            async with session.get(url, params=params, headers=headers, trace_request_ctx=metrics) as response:
+                if response.status != 429:
+                    await asyncio.to_thread(self.rate_limiter.observe, response.headers)
+                    validators = {h: response.headers[h] for h in VALIDATOR_HEADERS if h in response.headers}
+                    if response.status == 304:
+                        metrics.incr("not_modified")
+                        return None, 0, validators
+                    response.raise_for_status()
+                    if consume is not None:
+                        body, size = await consume(response)
+                    else:
+                        with metrics.timer("download"):
+                            body = await response.read()
+                        size = len(body)
+                    metrics.incr("bytes_downloaded", size)
+                    return body, size, validators
+                metrics.incr("http_429")
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            delay = await asyncio.to_thread(self.rate_limiter.penalize, retry_after)
+            logger.warning(f"Rate limited by KNMI (429), backing off {delay:.1f}s")
+        raise aiohttp.ClientResponseError(
+            response.request_info, response.history, status=429, message="Too Many Requests"
+        )
+
+    def _decode(self, body: bytes, decode: str) -> Any:
+        if decode == "raw":
+            return body
+        return json.loads(body)
+
+    async def _stream(
+        self, response: "aiohttp.ClientResponse", decoder: Callable[[_StreamReader], Any], executor: ThreadPoolExecutor, metrics: Metrics
+    ) -> Tuple[Any, int]:
+        """
+        Feed the response body to `decoder`, running in `executor`, as it
+        arrives. Download time includes the decoding it overlaps with;
+        decode time is what remains once the body is in.
+        """
+        loop = asyncio.get_running_loop()
+        reader = _StreamReader(loop)
+
+        def _decode() -> Any:
+            try:
+                return decoder(reader)
+            finally:
+                reader.stop()
+
+        decoding = loop.run_in_executor(executor, _decode)
+        size = 0
+        try:
+            with metrics.timer("download"):
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+                    size += len(chunk)
+                    if not await reader.feed(chunk):
+                        # The decoder failed; its error is raised below
+                        break
+        except BaseException as e:
+            reader.end(e)
+            # The decoder now fails with the same error; nobody awaits it
+            decoding.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise
+        reader.end()
+        with metrics.timer("decode"):
+            return await decoding, size
+
+    async def _afetch_window(
+        self,
+        session: "aiohttp.ClientSession",
+        window: Window,
+        conditional: Optional[Dict[str, str]] = None,
+        consume: Optional[Callable[["aiohttp.ClientResponse"], Awaitable[Tuple[Any, int]]]] = None,
+    ) -> Any:
+        station_id, start_date, end_date = window
+        url, params = self._data_request(station_id, start_date, end_date)
+        # Turn stored validators (ETag, Last-Modified) into If-None-Match / If-Modified-Since
+        headers = {VALIDATOR_HEADERS[h]: v for h, v in (conditional or {}).items() if h in VALIDATOR_HEADERS}
+        logger.info(f"Fetching data for {station_id} from {start_date} to {end_date}")
+        metrics = self.window_metrics.setdefault(window, Metrics())
+        started = time.perf_counter()
+        try:
+            async for attempt in AsyncRetrying(**RETRY_POLICY):
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1:
+                        metrics.incr("retries")
+                    body, size, validators = await self._aget(session, url, params, headers or None, metrics, consume)
+        except Exception:
+            self.planner.observe_failure(parse_time(start_date), parse_time(end_date))
+            raise
+        self.validators[window] = validators
+        if body is None:
+            logger.info(f"Not modified: {station_id} from {start_date} to {end_date}")
+            return None
+        self.planner.observe(parse_time(start_date), parse_time(end_date), size, time.perf_counter() - started)
+        return body
+
+    async def fetch_many(
+        self,
+        windows: Iterable[Window],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+        decode: str = "json",
+        conditional: Optional[Dict[Window, Dict[str, str]]] = None,
+    ) -> AsyncIterator[Tuple[Window, Any]]:
+        """
+        Fetch many (station_id, start, end) windows concurrently.
+
+        Yields `(window, data)` pairs in completion order, with at most
+        `concurrency` requests in flight (default: KNMI_MAX_CONCURRENCY).
+        `decode` selects the payload: "json" (dict), "raw" (response bytes),
+        "table" (pyarrow.Table, see `fetch_table`) or "table_json" (table and
+        dict). Decoding runs in worker threads so it never stalls the event
+        loop; "table" and "table_json" decode the body while it downloads,
+        never holding the whole response text.
+        With `return_exceptions=True` a failed window yields its exception
+        instead of aborting the whole batch.
+        `conditional` maps windows to validators from an earlier response
+        ({"ETag": ..., "Last-Modified": ...}); if the server answers 304 the
+        window yields `NOT_MODIFIED`. Fresh validators land in `self.validators`,
+        each window's timings and counters in `self.window_metrics` (and,
+        summed, in `self.metrics`).
+        """
+        import aiohttp
+
+        limit = concurrency or self.settings.KNMI_MAX_CONCURRENCY
+        semaphore = asyncio.Semaphore(limit)
+        # One streaming decoder per request in flight; they block on the download,
+        # so they must not share the default executor with to_thread calls
+        executor = ThreadPoolExecutor(limit, thread_name_prefix="knmi-decode")
+        connector = aiohttp.TCPConnector(limit=limit, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.settings.HTTP_TIMEOUT)
+
+        async with aiohttp.ClientSession(
+            headers=self.headers, connector=connector, timeout=timeout, trace_configs=[trace_config()]
+        ) as session:
+            async def _run(window: Window) -> Tuple[Window, Any]:
+                metrics = self.window_metrics[window] = Metrics()
+                consume = None
+                if decode in STREAM_DECODERS:
+                    decoder = functools.partial(STREAM_DECODERS[decode], station_id=window[0])
+                    consume = functools.partial(self._stream, decoder=decoder, executor=executor, metrics=metrics)
+                async with semaphore:
+                    try:
+                        data = await self._afetch_window(session, window, (conditional or {}).get(window), consume)
+                        if data is None:
+                            return window, NOT_MODIFIED
+                        if consume is None:
+                            with metrics.timer("decode"):
+                                data = await asyncio.to_thread(self._decode, data, decode)
+                        return window, data
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        return window, e
+                    finally:
+                        self.metrics.merge(metrics)
+
+            tasks = [asyncio.ensure_future(_run(tuple(w))) for w in windows]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                executor.shutdown(wait=False)
@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import fsspec
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+STATION_SCHEMA = pa.schema([
+    ("station", pa.string()),
+    ("wmo_id", pa.string()),
+    ("name", pa.string()),
+    ("lon", pa.float64()),
+    ("lat", pa.float64()),
+    ("height", pa.float64()),
+    ("valid_from", pa.timestamp("s", tz="UTC")),
+    ("valid_to", pa.timestamp("s", tz="UTC")),
+])
+
+def station_index_path(data_root: str) -> str:
+    return f"{data_root}/metadata/stations.parquet"
+
+def _parse_period(props: Dict[str, Any]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Active period from EDR 'datetime' ('start/end', '..' = open) or
+    validFrom / validTo properties, whichever the feature carries.
+    """
+    start, end = props.get("validFrom"), props.get("validTo")
+    if "datetime" in props and isinstance(props["datetime"], str):
+        start, _, end = props["datetime"].partition("/")
+
+    def _parse(value):
+        if not value or value == "..":
+            return None
+        try:
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return _parse(start), _parse(end)
+
+def stations_table(geojson: Dict[str, Any]) -> pa.Table:
+    """
+    Flatten the locations FeatureCollection into one row per station.
+    """
+    rows = []
+    for feature in geojson.get("features", []):
+        props = feature.get("properties", {})
+        s_id = feature.get("id") or props.get("stationId") or props.get("wmoId")
+        if not s_id:
+            continue
+        coords = (feature.get("geometry") or {}).get("coordinates") or [None, None]
+        valid_from, valid_to = _parse_period(props)
+        rows.append({
+            "station": str(s_id),
+            "wmo_id": str(props["wmoId"]) if props.get("wmoId") is not None else None,
+            "name": props.get("name"),
+            "lon": coords[0],
+            "lat": coords[1],
+            "height": coords[2] if len(coords) > 2 else props.get("height"),
+            "valid_from": valid_from,
+            "valid_to": valid_to,
+        })
+    return pa.Table.from_pylist(rows, schema=STATION_SCHEMA)
+
+class StationIndex:
+    """
+    In-memory station lookup: O(1) by station/WMO id, substring name search,
+    nearest-station and bounding-box queries.
+
+    Spatial queries use the stations sorted by latitude: a bounding box or
+    search radius becomes a binary-searched latitude band, and only that band
+    is checked with vectorized NumPy (the whole network is ~60 stations).
+    """
+    def __init__(self, table: pa.Table):
+        self.table = table.sort_by("station")
+        self._rows: List[Dict[str, Any]] = self.table.to_pylist()
+        self._by_id = {row["station"]: row for row in self._rows}
+        self._by_wmo = {row["wmo_id"]: row for row in self._rows if row["wmo_id"]}
+
+        located = [row for row in self._rows if row["lat"] is not None and row["lon"] is not None]
+        located.sort(key=lambda row: row["lat"])
+        self._located = located
+        self._lat = np.array([row["lat"] for row in located], dtype=np.float64)
+        self._lon = np.array([row["lon"] for row in located], dtype=np.float64)
+
+    @classmethod
+    def from_geojson(cls, geojson: Dict[str, Any]) -> "StationIndex":
+        return cls(stations_table(geojson))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def get(self, station_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(station_id)
+
+    def by_wmo(self, wmo_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lookup by WMO number; '6260' and '06260' are equivalent.
+        """
+        return self._by_wmo.get(str(wmo_id).zfill(5)) or self._by_wmo.get(str(wmo_id))
+
+    def search(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Case-insensitive substring match on the station name.
+        """
+        needle = text.lower()
+        return [row for row in self._rows if row["name"] and needle in row["name"].lower()]
+
+    def within_bbox(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> List[Dict[str, Any]]:
+        lo = np.searchsorted(self._lat, min_lat, side="left")
+        hi = np.searchsorted(self._lat, max_lat, side="right")
+        lon = self._lon[lo:hi]
+        hits = np.nonzero((lon >= min_lon) & (lon <= max_lon))[0]
+        return [self._located[lo + i] for i in hits]
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_km: Optional[float] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        The `k` closest stations as (row, great-circle distance in km).
+        """
+        if not self._located:
+            return []
+        lo, hi = 0, len(self._located)
+        if max_km is not None:
+            # Only stations in the latitude band can be within max_km
+            band = np.degrees(max_km / EARTH_RADIUS_KM)
+            lo = np.searchsorted(self._lat, lat - band, side="left")
+            hi = np.searchsorted(self._lat, lat + band, side="right")
+        distances = haversine_km(lat, lon, self._lat[lo:hi], self._lon[lo:hi])
+        order = np.argsort(distances)[:k]
+        result = [(self._located[lo + i], float(distances[i])) for i in order]
+        if max_km is not None:
+            result = [(row, d) for row, d in result if d <= max_km]
+        return result
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = np.radians(lat), np.radians(lon), np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+# path -> (file version, StationIndex)
+_INDEX_CACHE: Dict[str, Tuple[str, StationIndex]] = {}
+
+def load_station_index(fs: fsspec.AbstractFileSystem, path: str) -> StationIndex:
+    """
+    Load the station index written by the `station_index` asset, cached per
+    process. The file's ETag/mtime is the cache key, so a new
+    materialization is picked up while repeated calls cost a single HEAD.
+    """
+    info = fs.info(path)
+    version = str(info.get("ETag") or info.get("mtime") or info.get("LastModified") or info.get("created") or info.get("size"))
+    cached = _INDEX_CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with fs.open(path, "rb") as f:
+        index = StationIndex(pq.read_table(f))
+    _INDEX_CACHE[path] = (version, index)
+    return index
@@ -0,0 +1,142 @@
+import io
+import gzip
+import json
+import logging
+from typing import TYPE_CHECKING, Any, BinaryIO, Literal
+
+if TYPE_CHECKING:
+    import fsspec
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Compression = Literal["none", "gzip", "zstd"]
+
+# File suffix per codec; readers infer the codec from it
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Encoded JSON is handed to the writer in pieces of roughly this size
+JSON_WRITE_CHUNK = 256 * 1024
+
+def compressed_name(filename: str, compression: Compression) -> str:
+    """
+    e.g. ('data.json', 'gzip') -> 'data.json.gz'
+    """
+    return f"{filename}{COMPRESSION_SUFFIXES[compression]}"
+
+class _ByteCounter(io.RawIOBase):
+    """
+    Pass-through writer that counts the bytes that actually reach storage.
+    """
+    def __init__(self, f):
+        self._f = f
+        self.count = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._f.write(data)
+        n = len(data)
+        self.count += n
+        return n
+
+    def flush(self) -> None:
+        self._f.flush()
+
+class LandingWriter:
+    """
+    Binary writer that compresses on the fly into an fsspec file.
+
+    Data goes through the codec into s3fs's multipart buffer as it is
+    written, and `bytes_written` reports the stored (compressed) size
+    without a HEAD/info round trip afterwards. If the block raises, the
+    upload is discarded instead of committing a partial object.
+    """
+    def __init__(self, fs: "fsspec.AbstractFileSystem", path: str, compression: Compression = "none"):
+        self.path = path
+        self._file = fs.open(path, "wb")
+        self._counter = _ByteCounter(self._file)
+        if compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._counter, mode="wb", compresslevel=6)
+        elif compression == "zstd":
+            import pyarrow as pa
+            self._stream = pa.CompressedOutputStream(self._counter, "zstd")
+        else:
+            self._stream = self._counter
+
+    @property
+    def bytes_written(self) -> int:
+        return self._counter.count
+
+    def write(self, data: bytes) -> int:
+        return self._stream.write(data)
+
+    def close(self) -> None:
+        if self._stream is not self._counter and not self._stream.closed:
+            # Flushes the codec trailer through the counter
+            self._stream.close()
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self) -> None:
+        discard = getattr(self._file, "discard", None)
+        if discard is not None:
+            discard()
+        else:
+            self._file.close()
+
+    def __enter__(self) -> "LandingWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+def dump_json(obj: Any, writer: BinaryIO) -> None:
+    """
+    Stream-encode `obj` as JSON into a binary writer, without building the
+    whole document as one string first.
+    """
+    pending, size = [], 0
+    for piece in json.JSONEncoder().iterencode(obj):
+        pending.append(piece)
+        size += len(piece)
+        if size >= JSON_WRITE_CHUNK:
+            writer.write("".join(pending).encode("utf-8"))
+            pending, size = [], 0
+    if pending:
+        writer.write("".join(pending).encode("utf-8"))
+
+def copy_stream(source: BinaryIO, writer: BinaryIO, chunk_size: int = 1024 * 1024) -> None:
+    """
+    Copy a readable stream (e.g. an HTTP response body) into a writer.
+    """
+    while chunk := source.read(chunk_size):
+        writer.write(chunk)
+
+class TeeWriter:
+    """
+    Write the same bytes to several writers (e.g. storage + a parse buffer).
+    """
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def write(self, data: bytes) -> int:
+        for writer in self.writers:
+            writer.write(data)
+        return len(data)
+
+def open_landing(fs: "fsspec.AbstractFileSystem", path: str) -> BinaryIO:
+    """
+    Open a landing/metadata file for reading, decompressing by suffix.
+    """
+    if path.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        return fs.open(path, "rb", compression="gzip")
+    if path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        # fsspec's zstd codec needs the zstandard package; pyarrow ships one
+        import pyarrow as pa
+        return pa.CompressedInputStream(fs.open(path, "rb"), "zstd")
+    return fs.open(path, "rb")
@@ -0,0 +1,98 @@
+import logging
+import threading
+import functools
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# A planned API call: (start, end_exclusive, month starts it covers)
+PlannedWindow = Tuple[datetime, datetime, List[datetime]]
+
+def add_months(dt: datetime, n: int) -> datetime:
+    """
+    Shift a month-start datetime by `n` months.
+    """
+    index = dt.year * 12 + (dt.month - 1) + n
+    return dt.replace(year=index // 12, month=index % 12 + 1)
+
+def months_between(start: datetime, end: datetime) -> int:
+    """
+    Number of whole months in [start, end), at least 1.
+    """
+    return max(1, (end.year - start.year) * 12 + (end.month - start.month))
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a 'Z'-suffixed ISO8601 timestamp as returned/accepted by KNMI.
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+class WindowPlanner:
+    """
+    Decides how many months to request per EDR call.
+
+    Starts at `start_months` and doubles the span while responses stay well
+    under the size/time budget, halving it when a response exceeds the
+    budget or a multi-month call fails. State is per process, so every
+    partition handled by a worker benefits from what earlier calls learned.
+    """
+    def __init__(self, start_months: int, max_months: int, max_bytes: int, max_seconds: float):
+        self.max_months = max(1, max_months)
+        self.months_per_call = min(max(1, start_months), self.max_months)
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    def plan(self, months: Iterable[datetime]) -> List[PlannedWindow]:
+        """
+        Group month starts (for one station) into as few calls as the current
+        span allows. Only contiguous months are merged, so gaps in a partial
+        backfill never pull data nobody asked for.
+        """
+        span = self.months_per_call
+        windows: List[PlannedWindow] = []
+        for month in sorted(set(months)):
+            if windows:
+                start, end, covered = windows[-1]
+                if month == end and len(covered) < span:
+                    covered.append(month)
+                    windows[-1] = (start, add_months(month, 1), covered)
+                    continue
+            windows.append((month, add_months(month, 1), [month]))
+        return windows
+
+    def observe(self, start: datetime, end: datetime, n_bytes: int, seconds: float) -> None:
+        """
+        Feed back a successful call and adapt the span.
+        """
+        months = months_between(start, end)
+        with self._lock:
+            if n_bytes > self.max_bytes or seconds > self.max_seconds:
+                self.months_per_call = max(1, months // 2)
+                logger.info(f"Window of {months} month(s) over budget, shrinking to {self.months_per_call}")
+            elif (
+                months >= self.months_per_call
+                and n_bytes < self.max_bytes / 2
+                and seconds < self.max_seconds / 2
+                and self.months_per_call < self.max_months
+            ):
+                self.months_per_call = min(self.max_months, self.months_per_call * 2)
+                logger.info(f"Growing request window to {self.months_per_call} month(s)")
+
+    def observe_failure(self, start: datetime, end: datetime) -> None:
+        """
+        A multi-month call failed: assume it was too large.
+        """
+        months = months_between(start, end)
+        if months > 1:
+            with self._lock:
+                self.months_per_call = max(1, min(self.months_per_call, months // 2))
+
+@functools.lru_cache(maxsize=None)
+def get_window_planner(start_months: int, max_months: int, max_bytes: int, max_seconds: float) -> WindowPlanner:
+    """
+    Return the process-wide planner for this configuration.
+    """
+    return WindowPlanner(start_months, max_months, max_bytes, max_seconds)
@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import pyarrow as pa
+
+# Ensure src is in the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.coverage import coverage_to_table
+
+# Roughly one station-decade of hourly data, as returned by the EDR API
+YEARS = 10
+PARAMS = ["DD", "DR", "FF", "FX", "N", "P", "Q", "RH", "SQ", "T", "TD", "U", "VV", "WW"]
+REPEATS = 5
+
+def build_document(hours: int) -> dict:
+    start = datetime(2014, 1, 1, tzinfo=timezone.utc)
+    times = [(start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ") for i in range(hours)]
+    ranges = {
+        p: {
+            "type": "NdArray",
+            "dataType": "float",
+            "axisNames": ["t"],
+            "shape": [hours],
+            # Every 97th value missing, like gaps in real station data
+            "values": [None if i % 97 == 0 else float(i % 300) / 10 for i in range(hours)],
+        }
+        for p in PARAMS
+    }
+    return {
+        "type": "CoverageCollection",
+        "coverages": [{"type": "Coverage", "domain": {"axes": {"t": {"values": times}}}, "ranges": ranges}],
+    }
+
+def naive_decode(data: dict, station_id: str) -> pa.Table:
+    """
+    What the scripts in tests/ did: walk the lists value by value,
+    then build a table from the rows.
+    """
+    rows = []
+    for cov in data["coverages"]:
+        times = cov["domain"]["axes"]["t"]["values"]
+        ranges = cov["ranges"]
+        for i, t in enumerate(times):
+            row = {"timestamp": datetime.fromisoformat(t.replace("Z", "+00:00")), "station": station_id}
+            for param, rng in ranges.items():
+                value = rng["values"][i]
+                row[param] = float(value) if value is not None else None
+            rows.append(row)
+    return pa.Table.from_pylist(rows)
+
+def _timed(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+def best_of_interleaved(fns, *args) -> list[float]:
+    """
+    Best time per function, running them in turn within each repeat so a
+    burst of load on the machine hits both sides instead of skewing the ratio.
+    """
+    timings = [[] for _ in fns]
+    for _ in range(REPEATS):
+        for fn, fn_timings in zip(fns, timings):
+            fn_timings.append(_timed(fn, *args))
+    return [min(t) for t in timings]
+
+def run_benchmark():
+    print("--- CoverageJSON Decoder Microbenchmark ---")
+    hours = YEARS * 365 * 24
+    data = build_document(hours)
+    print(f"Document: {hours} timestamps x {len(PARAMS)} parameters")
+
+    naive, vectorized = best_of_interleaved([naive_decode, coverage_to_table], data, "0-20000-0-06260")
+
+    table = coverage_to_table(data, "0-20000-0-06260")
+    assert table.num_rows == hours, "Row count mismatch"
+    assert table["T"].null_count == len(range(0, hours, 97)), "Null mask mismatch"
+
+    print(f"Naive Python loop:  {naive * 1000:8.1f} ms")
+    print(f"coverage_to_table:  {vectorized * 1000:8.1f} ms")
+    speedup = naive / vectorized
+    print(f"Speedup:            {speedup:8.1f}x")
+    # Both sides start from json.loads output; the floor for the vectorized
+    # path is Arrow unboxing the Python floats, ~2.5 ms per parameter here.
+    assert speedup >= 10, f"Vectorized decoder is only {speedup:.1f}x faster than the naive loop (target: 10x)"
+    print("✅ Vectorized decoder is at least 10x faster than the naive loop.")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,63 @@
+import sys
+import os
+import pytest
+
+# Ensure src and tests are in the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mock_edr import MockEdrServer
+
+S3_BUCKET = "knmi-bench"
+
+@pytest.fixture(scope="session")
+def edr_server():
+    with MockEdrServer(stations=4) as server:
+        yield server
+
+@pytest.fixture(scope="session")
+def s3_endpoint():
+    """
+    moto S3 on localhost, shared by the session.
+    """
+    moto_server = pytest.importorskip("moto.server")
+    boto3 = pytest.importorskip("boto3")
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    boto3.client(
+        "s3", endpoint_url=endpoint, aws_access_key_id="bench", aws_secret_access_key="bench", region_name="us-east-1"
+    ).create_bucket(Bucket=S3_BUCKET)
+    yield endpoint
+    server.stop()
+
+@pytest.fixture
+def knmi_env(monkeypatch, tmp_path, edr_server):
+    """
+    Point KnmiSettings at the mock API and a local lake. Runs in tmp_path
+    so a developer's .env is not picked up.
+    """
+    monkeypatch.chdir(tmp_path)
+    for name in ("ENDPOINT_URL", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "KNMI_CACHE_DIR"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("KNMI_API_TOKEN", "bench")
+    monkeypatch.setenv("KNMI_API_BASE_URL", edr_server.base_url)
+    monkeypatch.setenv("DATA_ROOT", f"file://{tmp_path}/lake")
+    monkeypatch.setenv("KNMI_RATE_LIMIT_PER_SECOND", "100000")
+    monkeypatch.setenv("KNMI_RATE_LIMIT_BURST", "100000")
+    monkeypatch.setenv("KNMI_RATE_LIMIT_DB", str(tmp_path / "rate_limit.sqlite"))
+    return monkeypatch
+
+@pytest.fixture(params=["file", "s3"])
+def storage(request, knmi_env, tmp_path):
+    """
+    DATA_ROOT on the local filesystem or on moto S3.
+    """
+    if request.param == "s3":
+        endpoint = request.getfixturevalue("s3_endpoint")
+        knmi_env.setenv("DATA_ROOT", f"s3://{S3_BUCKET}/{tmp_path.name}")
+        knmi_env.setenv("ENDPOINT_URL", endpoint)
+        knmi_env.setenv("AWS_ACCESS_KEY_ID", "bench")
+        knmi_env.setenv("AWS_SECRET_ACCESS_KEY", "bench")
+    return request.param
@@ -0,0 +1,125 @@
+import time
+import asyncio
+import sqlite3
+import threading
+
+from mock_edr import MockEdrServer, station_ids
+from src.utils.coverage import coverage_to_table
+from src.utils.smart_client import KnmiClient
+
+STATIONS = station_ids(4)
+
+def _year_windows(year: int = 2020):
+    return [
+        (station_id, f"{year}-{month:02d}-01T00:00:00Z", f"{year + month // 12}-{month % 12 + 1:02d}-01T00:00:00Z")
+        for station_id in STATIONS
+        for month in range(1, 13)
+    ]
+
+def _drain(client: KnmiClient, windows, **kwargs):
+    async def _run():
+        return [item async for item in client.fetch_many(windows, **kwargs)]
+    return asyncio.run(_run())
+
+def test_fetch_data_station_year(benchmark, knmi_env):
+    """
+    One synchronous call for a full station-year (~8800 hours x 14 parameters).
+    """
+    client = KnmiClient()
+    data = benchmark(client.fetch_data, STATIONS[0], "2020-01-01T00:00:00Z", "2020-12-31T23:00:00Z")
+    assert len(data["coverages"][0]["domain"]["axes"]["t"]["values"]) == 366 * 24
+
+def test_fetch_many_json(benchmark, knmi_env, edr_server):
+    """
+    48 station-month windows, decoded to dicts, 8 in flight.
+    """
+    client = KnmiClient()
+    windows = _year_windows()
+    results = benchmark(_drain, client, windows, concurrency=8)
+    assert len(results) == len(windows)
+
+def test_fetch_many_tables(benchmark, knmi_env):
+    """
+    Same windows, decoded straight to Arrow tables in worker threads.
+    """
+    client = KnmiClient()
+    windows = _year_windows()
+    results = benchmark(_drain, client, windows, concurrency=8, decode="table")
+    assert sum(table.num_rows for _, table in results) > 0
+
+def test_fetch_many_table_json(benchmark, knmi_env):
+    """
+    Landing with the JSON copy kept: table and document from one streamed
+    pass, identical to decoding the buffered body.
+    """
+    client = KnmiClient()
+    windows = _year_windows()
+    results = benchmark(_drain, client, windows, concurrency=8, decode="table_json")
+    documents = dict(_drain(client, windows[:1], decode="json"))
+    table, document = dict(results)[windows[0]]
+    assert document == documents[windows[0]]
+    assert table.equals(coverage_to_table(document, windows[0][0]))
+
+def test_fetch_many_with_latency(benchmark, knmi_env):
+    """
+    50 ms per response: wall time should approach windows / concurrency x latency.
+    """
+    with MockEdrServer(stations=4, latency=0.05) as slow:
+        knmi_env.setenv("KNMI_API_BASE_URL", slow.base_url)
+        client = KnmiClient()
+        windows = _year_windows()
+        results = benchmark.pedantic(_drain, args=(client, windows), kwargs={"concurrency": 16}, rounds=3)
+    assert len(results) == len(windows)
+
+def test_fetch_many_absorbs_429(benchmark, knmi_env):
+    """
+    Every 5th request is rate limited; all windows still succeed.
+    """
+    with MockEdrServer(stations=4, fail_every=5) as flaky:
+        knmi_env.setenv("KNMI_API_BASE_URL", flaky.base_url)
+        client = KnmiClient()
+        windows = _year_windows()
+        results = benchmark.pedantic(_drain, args=(client, windows), kwargs={"concurrency": 8}, rounds=3)
+        assert flaky.stats["rate_limited"] > 0
+        assert client.metrics.counters["http_429"] == flaky.stats["rate_limited"]
+    assert len(results) == len(windows)
+    assert not any(isinstance(data, Exception) for _, data in results)
+
+def test_fetch_many_waits_for_bucket_off_loop(knmi_env):
+    """
+    Another process holds the token bucket's SQLite lock for a while: the
+    requests wait for it in threads and the event loop keeps running.
+    """
+    client = KnmiClient()
+    locked = threading.Event()
+
+    def hold(seconds: float):
+        conn = sqlite3.connect(client.rate_limiter.db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        locked.set()
+        time.sleep(seconds)
+        conn.execute("COMMIT")
+        conn.close()
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        results = [item async for item in client.fetch_many(_year_windows()[:4])]
+        ticker.cancel()
+        return ticks, results
+
+    holder = threading.Thread(target=hold, args=(0.5,))
+    holder.start()
+    locked.wait()
+    ticks, results = asyncio.run(run())
+    holder.join()
+    assert not any(isinstance(data, Exception) for _, data in results)
+    # ~50 while the lock is held; a blocked loop manages a handful at most
+    assert ticks >= 20
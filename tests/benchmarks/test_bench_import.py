@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Webserver, daemon, run workers and sensor ticks all import the code location;
+# these belong inside the asset/resource bodies that use them
+HEAVY_MODULES = ("pyarrow", "polars", "duckdb", "numpy", "aiohttp", "requests", "fsspec", "s3fs", "ijson", "streamlit")
+
+# Import time of everything `src.definitions` loads on top of dagster (about
+# 200 ms today; eagerly importing pyarrow alone adds ~300 ms)
+IMPORT_BUDGET_MS = 400
+
+def _cold_import() -> str:
+    """
+    Import the code location in a fresh interpreter; returns the -X importtime report.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.definitions"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return result.stderr
+
+def _parse(report: str):
+    """
+    (depth, module, self µs) per line of an importtime report.
+    """
+    entries = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        entries.append(((len(name) - len(name.lstrip()) - 1) // 2, name.strip(), int(self_us)))
+    return entries
+
+def project_import_ms(report: str) -> float:
+    """
+    Self time of every module not imported by dagster itself. The report is
+    in post-order (children first), so reversed it lists each module after
+    its ancestors.
+    """
+    total, ancestors = 0, []
+    for depth, name, self_us in reversed(_parse(report)):
+        ancestors = ancestors[:depth] + [name]
+        if not any(module.startswith("dagster") for module in ancestors):
+            total += self_us
+    return total / 1000
+
+def test_code_location_skips_heavy_imports():
+    imported = {name.split(".")[0] for _, name, _ in _parse(_cold_import())}
+    assert not imported & set(HEAVY_MODULES), f"imported by src.definitions: {sorted(imported & set(HEAVY_MODULES))}"
+
+def test_code_location_import_time(benchmark):
+    """
+    Cold start of the code location, and the budget for our share of it.
+    """
+    report = benchmark.pedantic(_cold_import, rounds=3)
+    cost = project_import_ms(report)
+    assert cost < IMPORT_BUDGET_MS, f"src.definitions imports take {cost:.0f} ms on top of dagster (budget {IMPORT_BUDGET_MS} ms)"
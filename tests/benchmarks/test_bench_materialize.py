@@ -0,0 +1,201 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from dagster import DagsterInstance, Definitions, define_asset_job, materialize
+
+from mock_edr import MockEdrServer, station_ids
+from src.assets.bronze import bronze_observations, bronze_path
+from src.assets.ingestion import FORCE_REFETCH_TAG, knmi_hourly_observations
+from src.assets.metadata import raw_stations_list, stations_path
+from src.resources import KnmiClientResource
+from src.utils.landing_manifest import LandingManifest
+from src.utils.smart_client import KnmiClient
+from src.utils.storage import open_landing
+
+STATIONS = station_ids(4)
+
+def _defs():
+    return Definitions(
+        assets=[knmi_hourly_observations, bronze_observations],
+        jobs=[
+            define_asset_job("landing", selection=[knmi_hourly_observations]),
+            define_asset_job("bronze", selection=[bronze_observations]),
+        ],
+        resources={"knmi": KnmiClientResource()},
+    )
+
+def _instance() -> DagsterInstance:
+    instance = DagsterInstance.ephemeral()
+    instance.add_dynamic_partitions("knmi_stations", STATIONS)
+    return instance
+
+def _statuses(result) -> dict:
+    """
+    {partition key: landing status} of a run's materializations.
+    """
+    return {
+        event.partition: event.materialization.metadata["status"].value
+        for event in result.get_asset_materialization_events()
+    }
+
+def _run_landing(defs, instance, first: str, last: str, force: bool = True, incremental: bool = False):
+    result = defs.resolve_job_def("landing").execute_in_process(
+        instance=instance,
+        run_config={"ops": {"knmi_hourly_observations": {"config": {"incremental": incremental}}}},
+        tags={
+            "dagster/asset_partition_range_start": first,
+            "dagster/asset_partition_range_end": last,
+            FORCE_REFETCH_TAG: "true" if force else "false",
+        },
+    )
+    assert result.success
+    return result
+
+def test_materialize_station_year(benchmark, storage):
+    """
+    Landing for one station, 12 months: fetch, split and write per partition.
+    """
+    defs, instance = _defs(), _instance()
+    result = benchmark.pedantic(
+        _run_landing, args=(defs, instance, f"2020-01-01|{STATIONS[0]}", f"2020-12-01|{STATIONS[0]}"), rounds=3
+    )
+    statuses = _statuses(result)
+    assert len(statuses) == 12
+    # Forced: the manifest is bypassed and every partition is rewritten
+    assert set(statuses.values()) == {"written"}
+
+def test_materialize_month_all_stations(benchmark, storage):
+    """
+    Landing for one month of every station.
+    """
+    defs, instance = _defs(), _instance()
+    result = benchmark.pedantic(
+        _run_landing, args=(defs, instance, f"2020-06-01|{STATIONS[0]}", f"2020-06-01|{STATIONS[-1]}"), rounds=3
+    )
+    assert set(_statuses(result)) == {f"2020-06-01|{station}" for station in STATIONS}
+
+def test_rerun_unchanged_year(benchmark, knmi_env, edr_server):
+    """
+    Rerun of an already landed year: the manifest short-circuits uploads
+    (and fetches, for settled months).
+    """
+    defs, instance = _defs(), _instance()
+    _run_landing(defs, instance, f"2020-01-01|{STATIONS[0]}", f"2020-12-01|{STATIONS[-1]}")
+    before = dict(edr_server.stats)
+    result = benchmark.pedantic(
+        _run_landing, args=(defs, instance, f"2020-01-01|{STATIONS[0]}", f"2020-12-01|{STATIONS[-1]}"),
+        kwargs={"force": False}, rounds=3,
+    )
+    statuses = _statuses(result)
+    assert len(statuses) == 12 * len(STATIONS)
+    # 2020 is long settled: nothing is requested at all
+    assert set(statuses.values()) == {"settled"}
+    assert edr_server.stats["requests"] == before["requests"]
+
+def test_rerun_revalidates_with_warm_planner(knmi_env, edr_server):
+    """
+    The first run grows the planner's span, so a replan would cover other
+    windows than the manifest's validators belong to. The rerun asks for
+    the stored windows and every partition comes back 304.
+    """
+    # Nothing settles, so every partition is revalidated
+    knmi_env.setenv("KNMI_LANDING_SETTLED_DAYS", "100000")
+    defs, instance = _defs(), _instance()
+    planner = KnmiClient().planner
+    planner.months_per_call = 1
+    _run_landing(defs, instance, f"2020-01-01|{STATIONS[0]}", f"2020-12-01|{STATIONS[-1]}")
+    assert planner.months_per_call > 1
+
+    before = dict(edr_server.stats)
+    result = _run_landing(defs, instance, f"2020-01-01|{STATIONS[0]}", f"2020-12-01|{STATIONS[-1]}", force=False)
+    assert set(_statuses(result).values()) == {"not_modified"}
+    assert edr_server.stats["not_modified"] - before["not_modified"] == 12 * len(STATIONS)
+    assert edr_server.stats["data"] == before["data"]
+
+def test_full_run_after_append_keeps_month(knmi_env):
+    """
+    A near-real-time append followed by a normal run of the running month:
+    the month is revalidated with its own landing window, never with the
+    few-hour append slice, so the landed rows are kept.
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    month = now.replace(day=1, hour=0)
+    hours = int((now - month).total_seconds() // 3600)
+    if hours < 3:
+        pytest.skip("the running month needs a few hours of data")
+    partition = f"{month:%Y-%m-%d}|{STATIONS[0]}"
+    client = KnmiClient()
+
+    def rows() -> int:
+        manifest = LandingManifest(client.get_filesystem(), client.settings.DATA_ROOT)
+        return manifest.load([(STATIONS[0], month)])[(STATIONS[0], month)]["rows"]
+
+    with MockEdrServer(stations=4, until=month + timedelta(hours=hours // 3)) as server:
+        knmi_env.setenv("KNMI_API_BASE_URL", server.base_url)
+        defs, instance = _defs(), _instance()
+        _run_landing(defs, instance, partition, partition)
+        landed = rows()
+
+        server.until = month + timedelta(hours=2 * hours // 3)
+        result = _run_landing(defs, instance, partition, partition, force=False, incremental=True)
+        assert _statuses(result) == {partition: "appended"}
+        appended = rows()
+        assert appended > landed
+
+        server.until = now
+        result = _run_landing(defs, instance, partition, partition, force=False)
+        assert _statuses(result) == {partition: "written"}
+        # Every hour from the month start through `now`
+        assert rows() == hours + 1
+
+def test_failed_partition_keeps_landed_ones(knmi_env):
+    """
+    One station's requests fail: the run fails, but the other stations'
+    partitions are still materialized for bronze to pick up.
+    """
+    with MockEdrServer(stations=4, fail_stations=[STATIONS[-1]]) as flaky:
+        knmi_env.setenv("KNMI_API_BASE_URL", flaky.base_url)
+        defs, instance = _defs(), _instance()
+        result = defs.resolve_job_def("landing").execute_in_process(instance=instance, raise_on_error=False, tags={
+            "dagster/asset_partition_range_start": f"2020-06-01|{STATIONS[0]}",
+            "dagster/asset_partition_range_end": f"2020-06-01|{STATIONS[-1]}",
+        })
+    assert not result.success
+    assert instance.get_materialized_partitions(knmi_hourly_observations.key) == {
+        f"2020-06-01|{station}" for station in STATIONS[:-1]
+    }
+
+def test_stations_list_retry_after_cut_body(knmi_env):
+    """
+    The first locations response breaks off after more than one copy chunk
+    has been written: the retry rewrites stations.json from scratch instead
+    of appending to the partial body.
+    """
+    stations = station_ids(8000)
+    with MockEdrServer(stations=len(stations), cut_locations=1) as flaky:
+        knmi_env.setenv("KNMI_API_BASE_URL", flaky.base_url)
+        result = materialize([raw_stations_list], resources={"knmi": KnmiClientResource()})
+        assert flaky.stats["requests"] == 2
+    assert result.output_for_node("raw_stations_list") == stations
+    client = KnmiClient()
+    with open_landing(client.get_filesystem(), stations_path(client.settings)) as f:
+        assert len(json.load(f)["features"]) == len(stations)
+
+def test_materialize_bronze_month(benchmark, knmi_env):
+    """
+    Compacting one month of all stations from landing into bronze.
+    """
+    defs, instance = _defs(), _instance()
+    _run_landing(defs, instance, f"2020-06-01|{STATIONS[0]}", f"2020-06-01|{STATIONS[-1]}")
+    job = defs.resolve_job_def("bronze")
+    client = KnmiClient()
+    manifest = bronze_path(client.settings.DATA_ROOT, datetime(2020, 6, 1, tzinfo=timezone.utc), "_manifest.json")
+
+    def _compact():
+        # Without the bronze manifest every round decodes all stations
+        fs = client.get_filesystem()
+        if fs.exists(manifest):
+            fs.rm(manifest)
+        assert job.execute_in_process(instance=instance, partition_key="2020-06-01").success
+    benchmark.pedantic(_compact, rounds=3)
@@ -0,0 +1,88 @@
+import io
+import os
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from mock_edr import coverage_document
+from src.assets.ingestion import _write_json, _write_parquet, landing_path
+from src.utils.coverage import coverage_to_table, stream_coverage_table
+from src.utils.smart_client import KnmiClient
+
+STATION = "0-20000-0-06260"
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+END = datetime(2020, 12, 31, 23, tzinfo=timezone.utc)
+
+@pytest.fixture(scope="module")
+def station_year():
+    return coverage_document(STATION, START, END)
+
+@pytest.fixture(scope="module")
+def station_year_bytes(station_year):
+    return json.dumps(station_year).encode("utf-8")
+
+def test_decode_coverage_to_table(benchmark, station_year):
+    table = benchmark(coverage_to_table, station_year, STATION)
+    assert table.num_rows == 366 * 24
+
+def test_decode_streaming(benchmark, station_year_bytes):
+    """
+    ijson decoder used for landing files: bytes in, table out, bounded memory.
+    """
+    table = benchmark(lambda: stream_coverage_table(io.BytesIO(station_year_bytes), STATION))
+    assert table.num_rows == 366 * 24
+
+def test_decode_streaming_type_after_values():
+    """
+    JSON objects are unordered: a dataType after its values still applies.
+    """
+    doc = {"coverages": [{
+        "domain": {"axes": {"t": {"values": ["2020-01-01T00:00:00Z", "2020-01-01T01:00:00Z"]}}},
+        "ranges": {"WW": {"values": [61, None], "dataType": "integer"}, "T": {"values": [1.5, None]}},
+    }]}
+    table = stream_coverage_table(io.BytesIO(json.dumps(doc).encode("utf-8")), STATION)
+    assert table.schema.field("WW").type == "int64" and table["WW"].to_pylist() == [61, None]
+    assert table.equals(coverage_to_table(doc, STATION))
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "zstd"])
+def test_write_landing_json(benchmark, storage, station_year, compression):
+    client = KnmiClient()
+    fs = client.get_filesystem()
+    path = landing_path(client.settings.DATA_ROOT, STATION, START, f"data.json.{compression}")
+    size = benchmark(_write_json, fs, path, station_year, compression)
+    assert size > 0 and fs.exists(path)
+
+def test_write_landing_parquet(benchmark, storage, station_year):
+    client = KnmiClient()
+    fs = client.get_filesystem()
+    table = coverage_to_table(station_year, STATION)
+    path = landing_path(client.settings.DATA_ROOT, STATION, START, "data.parquet")
+    size = benchmark(_write_parquet, fs, path, table)
+    assert size > 0 and fs.exists(path)
+
+def test_read_cache_revalidates(benchmark, tmp_path):
+    """
+    Reading an expired but unchanged cached file (one metadata request, no
+    download); a settled month rewritten in place is still picked up.
+    """
+    import fsspec
+    from src.utils.read_cache import ReadCacheFileSystem
+
+    remote = fsspec.filesystem("file", auto_mkdir=True)
+    cache = ReadCacheFileSystem(remote, str(tmp_path / "cache"), max_bytes=1 << 30, ttl_seconds=0)
+    path = str(tmp_path / "bronze/year=2020/month=01/data.parquet")
+    remote.pipe_file(path, b"v1")
+
+    def read():
+        with cache.open(path) as f:
+            return f.read()
+
+    assert read() == b"v1"
+    local = cache._local_path(cache._key(path))
+    copy = os.stat(local).st_ino
+    assert benchmark(read) == b"v1"
+    assert os.stat(local).st_ino == copy
+
+    remote.pipe_file(path, b"v2, rewritten")
+    assert read() == b"v2, rewritten"
@@ -2,10 +2,10 @@ import sys
 import os
 import json
 import logging
-import requests
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from src.utils.smart_client import KnmiClient
+from src.utils.stations import StationIndex
 
 logging.basicConfig(level=logging.INFO)
 
@@ -20,7 +20,7 @@ def analyze_de_bilt():
     headers = {"Authorization": client.settings.KNMI_API_TOKEN}
     
     try:
-        r = requests.get(url, headers=headers, params={"f": "json"})
+        r = client.session.get(url, headers=headers, params={"f": "json"})
         r.raise_for_status()
         meta = r.json()
         
@@ -42,19 +42,14 @@ def analyze_de_bilt():
     print(f"\n[2/3] Searching for 'De Bilt'...")
     de_bilt_id = None
     try:
-        locations = client.fetch_locations()
-        if "features" in locations:
-            for feat in locations["features"]:
-                props = feat.get("properties", {})
-                name = props.get("name", "Unknown")
-                
-                if "bilt" in name.lower():
-                    de_bilt_id = feat.get("id")
-                    print(f"✅ Found Station: {name}")
-                    print(f"   ID: {de_bilt_id}")
-                    print(f"   WMO: {props.get('wmoId')}")
-                    print(f"   Coords: {feat.get('geometry', {}).get('coordinates')}")
-                    break
+        stations = StationIndex.from_geojson(client.fetch_locations())
+        for station in stations.search("bilt"):
+            de_bilt_id = station["station"]
+            print(f"✅ Found Station: {station['name']}")
+            print(f"   ID: {de_bilt_id}")
+            print(f"   WMO: {station['wmo_id']}")
+            print(f"   Coords: {[station['lon'], station['lat']]}")
+            break
         
         if not de_bilt_id:
             print("❌ 'De Bilt' not found in station list.")
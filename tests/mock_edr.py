@@ -0,0 +1,213 @@
+import sys
+import json
+import asyncio
+import argparse
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from aiohttp import web
+
+# Local stand-in for the KNMI EDR API: synthetic stations and hourly
+# CoverageJSON for any requested range, with configurable latency and 429s.
+#
+#   python tests/mock_edr.py --port 8766 --latency 0.05 --fail-every 10
+#   KNMI_API_BASE_URL=http://127.0.0.1:8766 uv run dagster dev
+
+PARAMETERS = ["DD", "DR", "FF", "FX", "N", "P", "Q", "RH", "SQ", "T", "TD", "U", "VV", "WW"]
+
+def station_ids(count: int) -> List[str]:
+    return [f"0-20000-0-{6200 + i:05d}" for i in range(count)]
+
+def locations_document(count: int) -> Dict[str, Any]:
+    features = []
+    for i, station_id in enumerate(station_ids(count)):
+        features.append({
+            "type": "Feature",
+            "id": station_id,
+            "geometry": {"type": "Point", "coordinates": [3.5 + (i % 10) * 0.35, 50.8 + (i // 10) * 0.3, float(i)]},
+            "properties": {"name": f"Station {i:02d}", "wmoId": station_id.rsplit("-", 1)[1]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+def coverage_document(station_id: str, start: datetime, end: datetime, parameters: int = len(PARAMETERS), missing_every: int = 97) -> Dict[str, Any]:
+    """
+    Hourly CoverageJSON for [start, end] (inclusive, like KNMI). Values are a
+    deterministic function of the timestamp, so repeated calls are identical.
+    """
+    first = int(start.timestamp()) // 3600 + (1 if start.timestamp() % 3600 else 0)
+    hours = np.arange(first, int(end.timestamp()) // 3600 + 1, dtype=np.int64)
+    times = [
+        datetime.fromtimestamp(h * 3600, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") for h in hours.tolist()
+    ]
+    seed = int(station_id.rsplit("-", 1)[1])
+    ranges = {}
+    for p, name in enumerate((PARAMETERS * (parameters // len(PARAMETERS) + 1))[:parameters]):
+        key = name if p < len(PARAMETERS) else f"{name}{p}"
+        values = np.round(((hours * (p + 3) + seed) % 400) / 10.0, 1).tolist()
+        if missing_every:
+            for i in np.nonzero((hours + p) % missing_every == 0)[0].tolist():
+                values[i] = None
+        ranges[key] = {"type": "NdArray", "dataType": "float", "axisNames": ["t"], "shape": [len(times)], "values": values}
+    return {
+        "type": "CoverageCollection",
+        "domainType": "PointSeries",
+        "coverages": [{
+            "type": "Coverage",
+            "domain": {"type": "Domain", "axes": {"x": {"values": [5.18]}, "y": {"values": [52.1]}, "t": {"values": times}}},
+            "ranges": ranges,
+        }],
+        "parameters": {key: {"type": "Parameter"} for key in ranges},
+    }
+
+class MockEdrServer:
+    """
+    aiohttp server on a background thread.
+
+    - latency: seconds added to every data response
+    - fail_every: every n-th data request gets a 429 with Retry-After: 0
+    - parameters: ranges per coverage (payload size scales linearly)
+    - fail_stations: stations whose data requests always get a 500
+    - cut_locations: the first n locations responses break off 4 KiB short
+    - until: the server's "now"; data responses end there (unset = the whole window)
+
+    Data responses carry an ETag and honour If-None-Match. `stats` counts
+    requests, 304s, 429s and body bytes.
+    """
+    def __init__(
+        self,
+        stations: int = 4,
+        parameters: int = len(PARAMETERS),
+        latency: float = 0.0,
+        fail_every: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_stations: Iterable[str] = (),
+        cut_locations: int = 0,
+        until: Optional[datetime] = None,
+    ):
+        self.stations = stations
+        self.parameters = parameters
+        self.latency = latency
+        self.fail_every = fail_every
+        self.host = host
+        self.port = port
+        self.fail_stations = set(fail_stations)
+        self.cut_locations = cut_locations
+        self.until = until
+        self.stats = {"requests": 0, "data": 0, "not_modified": 0, "rate_limited": 0, "bytes": 0}
+        self._bodies: Dict[tuple, bytes] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/collections/{collection}/locations", self._locations)
+        app.router.add_get("/collections/{collection}/locations/{station_id}", self._data)
+        return app
+
+    async def _locations(self, request: web.Request) -> web.StreamResponse:
+        self.stats["requests"] += 1
+        body = json.dumps(locations_document(self.stations)).encode("utf-8")
+        if self.cut_locations:
+            self.cut_locations -= 1
+            response = web.StreamResponse(headers={"Content-Type": "application/json"})
+            response.content_length = len(body)
+            await response.prepare(request)
+            await response.write(body[:-4096])
+            request.transport.close()
+            return response
+        return web.Response(body=body, content_type="application/json")
+
+    async def _data(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        if self.fail_every and self.stats["requests"] % self.fail_every == 0:
+            self.stats["rate_limited"] += 1
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        station_id = request.match_info["station_id"]
+        if station_id in self.fail_stations:
+            return web.Response(status=500)
+        window = request.query.get("datetime", "")
+        start, _, end = window.partition("/")
+        start, end = _parse(start), _parse(end)
+        if self.until is not None:
+            end = min(end, self.until)
+        etag = f'"{abs(hash((station_id, window, end, self.parameters)))}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.stats["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        key = (station_id, window, end)
+        body = self._bodies.get(key)
+        if body is None:
+            doc = coverage_document(station_id, start, end, self.parameters)
+            body = json.dumps(doc).encode("utf-8")
+            # Generation is not what is being measured; keep recent bodies
+            if len(self._bodies) > 256:
+                self._bodies.clear()
+            self._bodies[key] = body
+        self.stats["data"] += 1
+        self.stats["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    def start(self) -> "MockEdrServer":
+        ready = threading.Event()
+
+        def _serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self._app(), access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, self.host, self.port)
+            self._loop.run_until_complete(site.start())
+            self.port = site._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_serve, name="mock-edr", daemon=True)
+        self._thread.start()
+        ready.wait(timeout=10)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
+
+    def __enter__(self) -> "MockEdrServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local KNMI EDR stand-in")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--stations", type=int, default=4)
+    parser.add_argument("--parameters", type=int, default=len(PARAMETERS))
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockEdrServer(args.stations, args.parameters, args.latency, args.fail_every, port=args.port).start()
+    print(f"Mock EDR API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+        sys.exit(0)
@@ -7,6 +7,7 @@ import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.utils.smart_client import KnmiClient
+from src.utils.coverage import coverage_to_table
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -44,17 +45,15 @@ def run_full_hourly_integration_test():
                     print(f"❌ Error: No 'coverages' in response for {year}")
                     continue
                     
-                cov = data['coverages'][0]
-                ranges = cov.get('ranges', {})
-                params = list(ranges.keys())
+                table = coverage_to_table(data, station_id)
+                params = table.column_names[2:]
                 
                 if not params:
                     print(f"❌ Error: No parameters found for {year}")
                     continue
                     
-                # Count records for first parameter
-                first_param = params[0]
-                count = len(ranges[first_param]['values'])
+                # Count records (one row per timestamp)
+                count = table.num_rows
                 total_records += count
                 
                 print(f"✅ Fetched {count} records (Hourly). Params: {len(params)}")
@@ -30,6 +30,13 @@ def verify_defs():
     
     if "knmi_hourly_observations" not in asset_names:
         print(f"❌ Missing 'knmi_hourly_observations'")
+
+    if "bronze_observations" not in asset_names:
+        print(f"❌ Missing 'bronze_observations'")
+
+    for name in ("silver_observations", "gold_daily", "gold_monthly", "gold_climatology"):
+        if name not in asset_names:
+            print(f"❌ Missing '{name}'")
         
     # 2. Check Sensors
     sensors = list(defs.sensors)